@@ -1,47 +1,147 @@
 """
 FocusForge session analyzer - transforms browser tracking events into structured JSON.
 """
+import heapq
 import json
-import re
+from functools import lru_cache
+from operator import itemgetter
 from urllib.parse import urlparse
 from typing import Dict, List, Optional, Any
-from collections import defaultdict
 
+# Optional NumPy/Numba fast path for very large sessions
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
+# Prefer the AOT-compiled aggregation (built by build_aot.py); it skips the
+# per-process JIT warm-up, which matters for the subprocess-per-request path
+# in backend/scripts/analyze.py
+_aot_aggregate = None
+if NUMPY_AVAILABLE:
+    try:
+        from analyzer_native import agg_durations as _aot_aggregate
+    except ImportError:
+        pass
+
+# JIT fallback when the AOT library is absent
+NUMBA_AVAILABLE = False
+if NUMPY_AVAILABLE and _aot_aggregate is None:
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+
+@lru_cache(maxsize=4096)
 def extract_domain(url: str) -> str:
-    """Extract domain from URL."""
+    """Extract domain from URL. URLs repeat heavily within a session, so
+    results are memoized across callers."""
     try:
-        parsed = urlparse(url)
-        domain = parsed.netloc or parsed.path
+        # Fast path for well-formed http(s) URLs: slice the host directly
+        if url.startswith(('http://', 'https://')):
+            domain = url.split('/', 3)[2]
+        else:
+            parsed = urlparse(url)
+            domain = parsed.netloc or parsed.path
         # Remove www. prefix
-        domain = re.sub(r'^www\.', '', domain, flags=re.IGNORECASE)
-        return domain.lower()
+        domain = domain.lower().removeprefix('www.')
+        return domain
     except Exception:
         return "unknown"
 
 
+# Below this many events the pure-Python loop wins; above it, the compiled
+# accumulation pays for its array setup many times over
+_VECTORIZED_MIN_EVENTS = 10000
+
+if _aot_aggregate is not None:
+    _aggregate_durations = _aot_aggregate
+elif NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _aggregate_durations(ids, durs, n):
+        out = np.zeros(n, np.int64)
+        for i in range(ids.size):
+            out[ids[i]] += durs[i]
+        return out
+else:
+    _aggregate_durations = None
+
+
+def _events_to_arrays(events: List[Dict]) -> tuple:
+    """Convert the list-of-dicts events into a structure-of-arrays form:
+    parallel (url_id, durationSec) arrays plus the url -> id mapping. The
+    arrays are what the compiled aggregation consumes; packing the numeric
+    columns contiguously is also far smaller than tens of thousands of
+    per-event dicts."""
+    url_to_id: Dict[str, int] = {}
+    ids = np.empty(len(events), dtype=np.int32)
+    durs = np.empty(len(events), dtype=np.int64)
+    for i, event in enumerate(events):
+        url = event.get("url", "")
+        ids[i] = url_to_id.setdefault(url, len(url_to_id))
+        durs[i] = event.get("durationSec", 0)
+    return ids, durs, url_to_id
+
+
+def _group_events_by_domain_vectorized(events: List[Dict]) -> Dict[str, Dict]:
+    """Array-backed aggregation for large sessions: accumulate per URL id
+    in compiled code, then fold the (few) distinct URLs into domains."""
+    ids, durs, url_to_id = _events_to_arrays(events)
+
+    if _aggregate_durations is not None:
+        totals = _aggregate_durations(ids, durs, len(url_to_id))
+    else:
+        # NumPy groupby-sum: bincount runs the inner loop in C
+        totals = np.bincount(ids, weights=durs, minlength=len(url_to_id)).astype(np.int64)
+
+    domain_data: Dict[str, Dict] = {}
+    for url, url_id in url_to_id.items():
+        domain = extract_domain(url)
+        bucket = domain_data.get(domain)
+        if bucket is None:
+            bucket = domain_data[domain] = {"timeSec": 0, "urls": {}}
+        duration = int(totals[url_id])
+        bucket["timeSec"] += duration
+        bucket["urls"][url] = bucket["urls"].get(url, 0) + duration
+
+    return domain_data
+
+
 def group_events_by_domain(events: List[Dict]) -> Dict[str, Dict]:
     """
     Group events by domain and compute timeSec and top URLs.
     Returns a dict: {domain: {"timeSec": int, "urls": {url: timeSec}}}
     """
-    domain_data = defaultdict(lambda: {"timeSec": 0, "urls": defaultdict(int)})
-    
+    if NUMPY_AVAILABLE and len(events) >= _VECTORIZED_MIN_EVENTS:
+        return _group_events_by_domain_vectorized(events)
+
+    domain_data: Dict[str, Dict] = {}
+    # Sessions revisit the same URLs; parse each distinct URL only once
+    domain_cache: Dict[str, str] = {}
+
     for event in events:
         url = event.get("url", "")
         duration = event.get("durationSec", 0)
-        domain = extract_domain(url)
-        
-        domain_data[domain]["timeSec"] += duration
-        domain_data[domain]["urls"][url] += duration
-    
+        domain = domain_cache.get(url)
+        if domain is None:
+            domain = domain_cache[url] = extract_domain(url)
+
+        bucket = domain_data.get(domain)
+        if bucket is None:
+            bucket = domain_data[domain] = {"timeSec": 0, "urls": {}}
+        bucket["timeSec"] += duration
+        bucket["urls"][url] = bucket["urls"].get(url, 0) + duration
+
     return domain_data
 
 
 def get_top_urls(url_dict: Dict[str, int], max_urls: int = 5) -> List[str]:
     """Get top N URLs by total time spent."""
-    sorted_urls = sorted(url_dict.items(), key=lambda x: x[1], reverse=True)
-    return [url for url, _ in sorted_urls[:max_urls]]
+    top_urls = heapq.nlargest(max_urls, url_dict.items(), key=itemgetter(1))
+    return [url for url, _ in top_urls]
 
 
 def create_workspaces_from_domains(domain_data: Dict[str, Dict], max_workspaces: int = 5) -> List[Dict]:
@@ -49,15 +149,15 @@ def create_workspaces_from_domains(domain_data: Dict[str, Dict], max_workspaces:
     Convert domain data into workspace objects.
     Labels are domain names (can be enhanced with Gemini later).
     """
-    # Sort by total time (descending)
-    sorted_domains = sorted(
+    # Top domains by total time (descending)
+    top_domains = heapq.nlargest(
+        max_workspaces,
         domain_data.items(),
-        key=lambda x: x[1]["timeSec"],
-        reverse=True
-    )[:max_workspaces]
-    
+        key=lambda x: x[1]["timeSec"]
+    )
+
     workspaces = []
-    for domain, data in sorted_domains:
+    for domain, data in top_domains:
         top_urls = get_top_urls(data["urls"], max_urls=5)
         workspaces.append({
             "label": domain,
@@ -73,9 +173,8 @@ def get_last_stop(events: List[Dict]) -> Dict[str, str]:
     if not events:
         return {"label": "Unknown", "url": ""}
     
-    # Sort by timestamp (descending) and get the last one
-    sorted_events = sorted(events, key=lambda x: x.get("ts", 0), reverse=True)
-    last_event = sorted_events[0]
+    # Single pass for the latest timestamp; no need to sort the whole list
+    last_event = max(events, key=lambda x: x.get("ts", 0))
     
     url = last_event.get("url", "")
     title = last_event.get("title", "")
@@ -87,15 +186,18 @@ def get_last_stop(events: List[Dict]) -> Dict[str, str]:
     }
 
 
-def analyzeSession(goal: str, eventsWithDuration: Dict) -> Dict[str, Any]:
+def analyzeSession(goal: str, eventsWithDuration: Dict, _precomputed: Optional[tuple] = None) -> Dict[str, Any]:
     """
     Main function to analyze browser session and return structured JSON.
-    
+
     Args:
         goal: User's goal string (can be empty)
         eventsWithDuration: Dict with "events" key containing list of event dicts
             Each event has: ts, url, title, durationSec
-    
+        _precomputed: Optional (domain_data, workspaces, last_stop) tuple from
+            a caller that already grouped the events (e.g. the Gemini
+            analyzers), so the fallback path doesn't redo the O(N) passes
+
     Returns:
         Dict matching the required schema:
         {
@@ -119,14 +221,17 @@ def analyzeSession(goal: str, eventsWithDuration: Dict) -> Dict[str, Any]:
             "pendingDecisions": []
         }
     
-    # Step 1: Group by domain
-    domain_data = group_events_by_domain(events)
-    
-    # Step 2: Create workspaces (limit to 5)
-    workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
-    
-    # Step 3: Get last stop
-    last_stop = get_last_stop(events)
+    if _precomputed is not None:
+        domain_data, workspaces, last_stop = _precomputed
+    else:
+        # Step 1: Group by domain
+        domain_data = group_events_by_domain(events)
+
+        # Step 2: Create workspaces (limit to 5)
+        workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
+
+        # Step 3: Get last stop
+        last_stop = get_last_stop(events)
     
     # Step 4: Prepare data for Gemini (if available)
     # For now, return basic structure without Gemini
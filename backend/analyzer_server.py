@@ -1,58 +1,295 @@
-#!/usr/bin/env python3
-"""
-Standalone HTTP server for Python analyzer.
-Can be deployed separately (Railway, Render, Fly.io, etc.)
-"""
-import os
-import sys
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-
-# Add parent directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-try:
-    from gemini_analyzer import analyzeSessionWithGemini
-except ImportError as e:
-    print(f"Error importing analyzer: {e}", file=sys.stderr)
-    sys.exit(1)
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
-
-@app.route('/health', methods=['GET'])
-def health():
-    """Health check endpoint"""
-    return jsonify({"status": "ok"})
-
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    """Analyze session events"""
-    try:
-        data = request.json
-        
-        if not data:
-            return jsonify({"error": "No data provided"}), 400
-        
-        goal = data.get('goal', '')
-        events = data.get('events', [])
-        
-        if not isinstance(events, list):
-            return jsonify({"error": "events must be an array"}), 400
-        
-        # Run analysis
-        result = analyzeSessionWithGemini(
-            goal,
-            {'events': events},
-            api_key=os.getenv('GEMINI_API_KEY'),
-            use_gemini=True
-        )
-        
-        return jsonify(result)
-    except Exception as e:
-        print(f"Analysis error: {e}", file=sys.stderr)
-        return jsonify({"error": str(e)}), 500
-
-if __name__ == '__main__':
-    port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=os.getenv('DEBUG', 'False').lower() == 'true')
+#!/usr/bin/env python3
+"""
+Standalone HTTP server for Python analyzer.
+Can be deployed separately (Railway, Render, Fly.io, etc.)
+"""
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    import fastjson
+    from analyzer import analyzeSession, group_events_by_domain, create_workspaces_from_domains, get_last_stop
+    from gemini_analyzer import (
+        analyzeSessionWithGemini,
+        GEMINI_PROMPT,
+        create_gemini_input,
+        clean_json_response,
+        normalize_ai_fields,
+        validate_output,
+        GEMINI_AVAILABLE,
+        _get_model,
+    )
+except ImportError as e:
+    print(f"Error importing analyzer: {e}", file=sys.stderr)
+    sys.exit(1)
+
+if GEMINI_AVAILABLE:
+    import google.generativeai as genai
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for all routes
+
+# Micro-batching: concurrent /analyze requests arriving within a short
+# window share one Gemini call (same prompt prefix, one user section per
+# session) instead of paying prefill per request. The batcher only engages
+# under concurrent load — a request that arrives with nothing else in
+# flight or queued runs inline and never waits out the window.
+_BATCH_WINDOW_SEC = 0.03
+_BATCH_MAX_SIZE = 8
+
+_batch_queue: "queue.Queue" = queue.Queue()
+_batcher_lock = threading.Lock()
+_batcher_started = False
+
+# Number of /analyze requests currently being served; gates whether a new
+# request can skip the batching window
+_inflight = 0
+_inflight_lock = threading.Lock()
+
+# Popped batches run on this pool so the batcher thread goes straight back
+# to coalescing; without it every Gemini round-trip serializes the requests
+# behind it, defeating the threaded workers
+_DISPATCH_MAX_WORKERS = 4
+_dispatch_pool = ThreadPoolExecutor(max_workers=_DISPATCH_MAX_WORKERS)
+
+
+# Disk cache of analyzer output: reloads and retries of the same session
+# are served from disk instead of repeating the Gemini call
+_CACHE_DIR = os.path.join(os.path.dirname(__file__), '.analyzer_cache')
+_CACHE_TTL_SEC = 86400  # 24h
+
+
+def _cache_key(goal, events):
+    """Stable key for one (goal, events) request."""
+    canonical = fastjson.dumps({"goal": goal, "events": events}, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(canonical).hexdigest()
+
+
+def _cache_get(key):
+    """Return a cached result, or None if absent or expired."""
+    path = os.path.join(_CACHE_DIR, key + '.json')
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+        if time.time() - entry['ts'] > _CACHE_TTL_SEC:
+            os.remove(path)
+            return None
+        return entry['result']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _cache_set(key, result):
+    """Store a result on disk; best-effort, failures are ignored."""
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        path = os.path.join(_CACHE_DIR, key + '.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'ts': time.time(), 'result': result}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _analyze_single(goal, events):
+    """Analyze one session with the normal (unbatched) path."""
+    return analyzeSessionWithGemini(
+        goal,
+        {'events': events},
+        api_key=os.getenv('GEMINI_API_KEY'),
+        use_gemini=True
+    )
+
+
+def _analyze_batch(batch):
+    """
+    Analyze several sessions with one Gemini call and resolve their futures.
+
+    The shared system prompt is sent once; each session contributes only its
+    input section. Falls back to per-session analysis if the batched call or
+    response splitting fails.
+    """
+    try:
+        if not GEMINI_AVAILABLE:
+            raise ImportError("google-generativeai is not installed.")
+
+        sections = []
+        for i, (goal, events, _) in enumerate(batch):
+            domain_data = group_events_by_domain(events)
+            workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
+            last_stop = get_last_stop(events)
+            sections.append(
+                f"Session {i + 1}:\n" + create_gemini_input(goal, events, workspaces, last_stop)
+            )
+
+        prompt = (
+            GEMINI_PROMPT
+            + f"\n\nYou will receive {len(batch)} independent sessions below. "
+            + f"Return ONLY a JSON array with exactly {len(batch)} result objects "
+            + "matching the schema, in the same order as the sessions.\n\n"
+            + "\n\n".join(sections)
+        )
+
+        # Shared model cache: a bare genai.configure here would reset the
+        # persistent gRPC transport the interactive path pins
+        model = _get_model(os.getenv('GEMINI_API_KEY'), 'gemini-2.5-flash')
+        response = model.generate_content(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                temperature=0.3,
+                top_p=0.95,
+                top_k=40,
+            )
+        )
+
+        results = fastjson.loads(clean_json_response(response.text))
+        if not isinstance(results, list) or len(results) != len(batch):
+            raise ValueError(
+                f"Batched response has {len(results) if isinstance(results, list) else 'no'} "
+                f"items, expected {len(batch)}"
+            )
+
+        for (goal, events, future), result in zip(batch, results):
+            try:
+                result = normalize_ai_fields(result)
+                validate_output(result, events)
+                future.set_result(result)
+            except Exception:
+                # This session's slice failed validation; basic analysis
+                future.set_result(analyzeSession(goal, {'events': events}))
+    except Exception as e:
+        print(f"Warning: batched analysis failed ({e}), analyzing individually", file=sys.stderr)
+        for goal, events, future in batch:
+            try:
+                future.set_result(_analyze_single(goal, events))
+            except Exception as single_error:
+                future.set_exception(single_error)
+
+
+def _dispatch_single(item):
+    """Run one unbatched analysis and resolve its future."""
+    goal, events, future = item
+    try:
+        future.set_result(_analyze_single(goal, events))
+    except Exception as e:
+        future.set_exception(e)
+
+
+def _batcher_loop():
+    """Coalesce queued requests into batches and hand them to the pool.
+
+    Dispatch happens off-thread so the loop resumes coalescing immediately:
+    a request arriving just after a batch was popped waits only for its own
+    window, not for the previous batch's Gemini round-trip.
+    """
+    while True:
+        batch = [_batch_queue.get()]
+        deadline = time.monotonic() + _BATCH_WINDOW_SEC
+        while len(batch) < _BATCH_MAX_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_batch_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        if len(batch) == 1:
+            _dispatch_pool.submit(_dispatch_single, batch[0])
+        else:
+            _dispatch_pool.submit(_analyze_batch, batch)
+
+
+def _ensure_batcher():
+    """Start the background batcher thread once."""
+    global _batcher_started
+    if _batcher_started:
+        return
+    with _batcher_lock:
+        if not _batcher_started:
+            thread = threading.Thread(target=_batcher_loop, daemon=True)
+            thread.start()
+            _batcher_started = True
+
+
+@app.route('/health', methods=['GET'])
+def health():
+    """Health check endpoint"""
+    return jsonify({"status": "ok"})
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Analyze session events"""
+    try:
+        data = fastjson.loads(request.data) if request.data else None
+
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+
+        goal = data.get('goal', '')
+        events = data.get('events', [])
+
+        if not isinstance(events, list):
+            return jsonify({"error": "events must be an array"}), 400
+
+        # Serve duplicate requests (reloads, retries) from the disk cache
+        cache_key = None
+        if events:
+            cache_key = _cache_key(goal, events)
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return jsonify(cached)
+
+        # Solo requests (nothing else in flight or queued) skip the batcher
+        # entirely: the coalescing window only buys anything when a second
+        # request could join the batch, and waiting it out alone just adds
+        # _BATCH_WINDOW_SEC to the response time
+        global _inflight
+        with _inflight_lock:
+            solo = _inflight == 0 and _batch_queue.empty()
+            _inflight += 1
+        try:
+            if solo:
+                result = _analyze_single(goal, events)
+            else:
+                # Concurrent load: enqueue so overlapping requests share
+                # one Gemini call
+                _ensure_batcher()
+                future = Future()
+                _batch_queue.put((goal, events, future))
+                result = future.result(timeout=120)
+        finally:
+            with _inflight_lock:
+                _inflight -= 1
+
+        # Cache only full Gemini results: a transient Gemini failure (rate
+        # limit, 500) falls back to basic analysis, and pinning that on
+        # disk would serve a degraded, AI-field-free result for the whole
+        # TTL instead of recomputing on the next request
+        if cache_key is not None and isinstance(result, dict) and "aiRecap" in result:
+            _cache_set(cache_key, result)
+
+        return app.response_class(fastjson.dumps_bytes(result), mimetype='application/json')
+    except Exception as e:
+        print(f"Analysis error: {e}", file=sys.stderr)
+        return jsonify({"error": str(e)}), 500
+
+if __name__ == '__main__':
+    # Development server only. In production, run under Gunicorn with threaded
+    # workers so concurrent /analyze requests overlap on Gemini I/O:
+    #   gunicorn -w 2 -k gthread --threads 8 -b 0.0.0.0:$PORT analyzer_server:app
+    # (see Procfile)
+    port = int(os.getenv('PORT', 5000))
+    app.run(host='0.0.0.0', port=port, debug=os.getenv('DEBUG', 'False').lower() == 'true')
@@ -1,8 +1,90 @@
 import type { NextApiRequest, NextApiResponse } from 'next'
-import { spawn } from 'child_process'
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process'
 import { join } from 'path'
 import { getSafeDefaultAnalysis } from '../../lib/utils'
 
+// Long-lived Python worker for local development. Spawning python per
+// request pays interpreter + import startup every time; instead one child
+// serves newline-delimited JSON requests over stdio, correlated by id.
+interface PendingRequest {
+  resolve: (value: any) => void
+  reject: (error: Error) => void
+}
+
+let worker: ChildProcessWithoutNullStreams | null = null
+let workerBuffer = ''
+let nextRequestId = 1
+const pendingRequests = new Map<number, PendingRequest>()
+
+function getWorker(): ChildProcessWithoutNullStreams {
+  if (worker) {
+    return worker
+  }
+
+  const backendDir = process.cwd()
+  const projectRoot = join(backendDir, '..')
+  const pythonScript = join(backendDir, 'scripts', 'analyze.py')
+
+  worker = spawn('python3', [pythonScript], {
+    env: {
+      ...process.env,
+      GEMINI_API_KEY: process.env.GEMINI_API_KEY || '',
+      PYTHONPATH: projectRoot
+    },
+    cwd: projectRoot
+  })
+  workerBuffer = ''
+
+  worker.stdout.on('data', (data: Buffer) => {
+    workerBuffer += data.toString()
+    let newlineIndex = workerBuffer.indexOf('\n')
+    while (newlineIndex >= 0) {
+      const line = workerBuffer.slice(0, newlineIndex).trim()
+      workerBuffer = workerBuffer.slice(newlineIndex + 1)
+      if (line) {
+        try {
+          const message = JSON.parse(line)
+          const pending = pendingRequests.get(message.id)
+          if (pending) {
+            pendingRequests.delete(message.id)
+            if (message.error) {
+              pending.reject(new Error(message.error))
+            } else {
+              pending.resolve(message.result)
+            }
+          }
+        } catch {
+          // Ignore malformed lines (e.g. stray prints from the analyzer)
+        }
+      }
+      newlineIndex = workerBuffer.indexOf('\n')
+    }
+  })
+
+  worker.stderr.on('data', (data: Buffer) => {
+    console.error('Python worker:', data.toString())
+  })
+
+  worker.on('close', () => {
+    worker = null
+    for (const pending of pendingRequests.values()) {
+      pending.reject(new Error('Python worker exited'))
+    }
+    pendingRequests.clear()
+  })
+
+  return worker
+}
+
+function analyzeWithLocalWorker(goal: string, events: any[]): Promise<any> {
+  const child = getWorker()
+  const id = nextRequestId++
+  return new Promise((resolve, reject) => {
+    pendingRequests.set(id, { resolve, reject })
+    child.stdin.write(JSON.stringify({ id, goal, events }) + '\n')
+  })
+}
+
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse
@@ -45,67 +127,9 @@ export default async function handler(
       }
     }
 
-    // Fallback to local Python (for local development)
-    const backendDir = process.cwd()
-    const projectRoot = join(backendDir, '..')
-    const pythonScript = join(backendDir, 'scripts', 'analyze.py')
-    
-    const pythonProcess = spawn('python3', [pythonScript], {
-      env: {
-        ...process.env,
-        GEMINI_API_KEY: process.env.GEMINI_API_KEY || '',
-        PYTHONPATH: projectRoot
-      },
-      cwd: projectRoot
-    })
-
-    let stdout = ''
-    let stderr = ''
-
-    pythonProcess.stdout.on('data', (data: Buffer) => {
-      stdout += data.toString()
-    })
-
-    pythonProcess.stderr.on('data', (data: Buffer) => {
-      stderr += data.toString()
-    })
-
-    pythonProcess.stdin.write(JSON.stringify({ goal: goal || '', events }))
-    pythonProcess.stdin.end()
-
-    const exitCode = await new Promise<number>((resolve) => {
-      pythonProcess.on('close', (code: number | null) => {
-        resolve(code || 0)
-      })
-    })
-
-    if (exitCode !== 0) {
-      let errorMessage = stderr || 'Python process failed'
-      try {
-        const errorObj = JSON.parse(stderr)
-        errorMessage = errorObj.error || errorMessage
-      } catch {
-        // Not JSON, use as-is
-      }
-      throw new Error(`Python analysis failed: ${errorMessage}`)
-    }
-
-    const output = stdout.trim()
-    if (!output) {
-      throw new Error('Python script returned empty output')
-    }
-
-    try {
-      const result = JSON.parse(output)
-      
-      if (result.error) {
-        throw new Error(result.error)
-      }
-      
-      return res.status(200).json(result)
-    } catch (parseError: any) {
-      throw new Error(`Failed to parse Python output: ${parseError.message}\nOutput: ${output}`)
-    }
+    // Fallback to local Python worker (for local development)
+    const result = await analyzeWithLocalWorker(goal || '', events)
+    return res.status(200).json(result)
   } catch (error: any) {
     console.error('Analysis error:', error)
     // Return safe default instead of error
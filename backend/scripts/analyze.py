@@ -1,45 +1,65 @@
-#!/usr/bin/env python3
-"""
-Standalone Python script for analysis that can be called from Node.js
-"""
-import sys
-import json
-import os
-
-# Add parent directory to path to import analyzer modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-
-try:
-    from gemini_analyzer import analyzeSessionWithGemini
-except ImportError as e:
-    print(json.dumps({"error": f"Failed to import analyzer: {e}"}), file=sys.stderr)
-    sys.exit(1)
-
-def main():
-    try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        goal = input_data.get('goal', '')
-        events = input_data.get('events', [])
-        
-        events_with_duration = {'events': events}
-        
-        # Get API key from environment
-        api_key = os.getenv('GEMINI_API_KEY')
-        
-        # Run analysis
-        result = analyzeSessionWithGemini(
-            goal, 
-            events_with_duration, 
-            api_key=api_key, 
-            use_gemini=True
-        )
-        
-        # Output result as JSON
-        print(json.dumps(result))
-    except Exception as e:
-        print(json.dumps({"error": str(e)}), file=sys.stderr)
-        sys.exit(1)
-
-if __name__ == '__main__':
-    main()
+#!/usr/bin/env python3
+"""
+Long-running analysis worker for Node.js.
+
+Reads newline-delimited JSON requests on stdin and writes one JSON
+response per line on stdout, so the interpreter and analyzer imports are
+paid once per process instead of once per request. Requests may carry an
+"id" field for correlation; the response is then wrapped as
+{"id": ..., "result": ...} or {"id": ..., "error": ...}. Requests
+without an "id" get the bare result (legacy one-shot behavior).
+"""
+import sys
+import json
+import os
+
+# Add parent directory to path to import analyzer modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+try:
+    import fastjson
+    from gemini_analyzer import analyzeSessionWithGemini
+except ImportError as e:
+    print(json.dumps({"error": f"Failed to import analyzer: {e}"}), file=sys.stderr)
+    sys.exit(1)
+
+def handle_request(line, api_key):
+    """Process one JSON request line and return the JSON response dict."""
+    request_id = None
+    try:
+        input_data = fastjson.loads(line)
+        request_id = input_data.get('id')
+        goal = input_data.get('goal', '')
+        events = input_data.get('events', [])
+
+        result = analyzeSessionWithGemini(
+            goal,
+            {'events': events},
+            api_key=api_key,
+            use_gemini=True
+        )
+
+        if request_id is None:
+            return result
+        return {'id': request_id, 'result': result}
+    except Exception as e:
+        if request_id is None:
+            return {'error': str(e)}
+        return {'id': request_id, 'error': str(e)}
+
+
+def main():
+    api_key = os.getenv('GEMINI_API_KEY')
+
+    # Serve until stdin closes; a single request without trailing newline
+    # (the old one-shot protocol) still arrives as one line at EOF
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        response = handle_request(line, api_key)
+        sys.stdout.write(fastjson.dumps(response) + '\n')
+        sys.stdout.flush()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Build script for the AOT-compiled analyzer aggregation module.
+
+Run once at install/deploy time:
+
+    python build_aot.py
+
+Produces an `analyzer_native` shared library next to analyzer.py, which
+analyzer.py prefers over @njit so the per-process JIT warm-up is skipped.
+This matters most for backend/scripts/analyze.py, which is spawned as a
+fresh process per request and would otherwise pay the compile cost every
+invocation.
+"""
+import numpy as np
+from numba.pycc import CC
+
+cc = CC('analyzer_native')
+
+
+@cc.export('agg_durations', 'i8[:](i4[:], i8[:], i8)')
+def agg_durations(ids, durs, n):
+    """Sum durations per URL id; mirrors analyzer._aggregate_durations."""
+    out = np.zeros(n, np.int64)
+    for i in range(ids.size):
+        out[ids[i]] += durs[i]
+    return out
+
+
+if __name__ == '__main__':
+    cc.compile()
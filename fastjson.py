@@ -0,0 +1,45 @@
+"""
+Thin wrapper around the fastest available JSON codec.
+
+Prefers orjson (3-10x faster than stdlib json in both directions) and falls
+back to the stdlib so orjson stays an optional dependency.
+"""
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def loads(data):
+    """Parse JSON from str or bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialize to a JSON str. indent=True means 2-space indentation."""
+    if ORJSON_AVAILABLE:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys)
+    # Match orjson's compact separators so output is codec-independent
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def dumps_bytes(obj) -> bytes:
+    """Serialize to JSON bytes (fast path for writing to streams)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
@@ -1,10 +1,16 @@
 """
 Enhanced analyzer with Gemini AI integration for intelligent analysis.
 """
+import heapq
 import json
 import os
+import re
+import threading
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
 from analyzer import analyzeSession, group_events_by_domain, create_workspaces_from_domains, get_last_stop, extract_domain
+import fastjson
 
 # Try to import Gemini (will fail gracefully if not installed)
 try:
@@ -42,18 +48,112 @@ Schema:
 }"""
 
 
+# Module-level caches shared by every Gemini caller in the process (this
+# module, the tools analyzer, the planner, and the backend server import
+# these helpers rather than keeping copies): genai.configure and
+# GenerativeModel construction are paid once per (api_key, model_name), the
+# tools proto is rebuilt only when the function set changes, and a single
+# configure state means one caller can never reset another's persistent
+# gRPC channel
+_CACHE_LOCK = threading.Lock()
+_MODEL_CACHE: Dict[tuple, Any] = {}
+_TOOLS_CACHE: Dict[tuple, Any] = {}
+_LAST_CONFIGURED_KEY: Optional[str] = None
+
+
+def _get_model(api_key: str, model_name: str):
+    """Get (or create and cache) a GenerativeModel for the given key/model."""
+    global _LAST_CONFIGURED_KEY
+    with _CACHE_LOCK:
+        if api_key != _LAST_CONFIGURED_KEY:
+            # Explicit gRPC transport: one persistent HTTP/2 channel
+            # multiplexes all generate_content calls, so repeated requests
+            # skip TLS setup and DNS resolution
+            genai.configure(api_key=api_key, transport='grpc')
+            _LAST_CONFIGURED_KEY = api_key
+            # Models are bound to the configured key; drop stale entries
+            _MODEL_CACHE.clear()
+
+        cache_key = (api_key, model_name)
+        model = _MODEL_CACHE.get(cache_key)
+        if model is None:
+            model = genai.GenerativeModel(model_name)
+            _MODEL_CACHE[cache_key] = model
+        return model
+
+
+def _get_tools_config(functions: List[Dict]):
+    """Get (or build and cache) the genai Tool proto for a function set."""
+    if not functions:
+        return None
+    cache_key = tuple(sorted(f["name"] for f in functions))
+    with _CACHE_LOCK:
+        tools_config = _TOOLS_CACHE.get(cache_key)
+        if tools_config is None:
+            tools_config = genai.protos.Tool(
+                function_declarations=[genai.protos.FunctionDeclaration(**f) for f in functions]
+            )
+            _TOOLS_CACHE[cache_key] = tools_config
+        return tools_config
+
+
+def _function_call_args(function_call) -> Dict[str, Any]:
+    """Decode a function_call's arguments to a plain dict.
+
+    In current SDK versions .args is a protobuf Struct/MapComposite, not a
+    JSON string; converting the message directly skips a serialize/re-parse
+    round-trip (and json.loads on a non-string would simply crash).
+    """
+    args = function_call.args
+    if args is None:
+        return {}
+    if isinstance(args, str):
+        return fastjson.loads(args)
+    if hasattr(args, 'DESCRIPTOR'):
+        from google.protobuf.json_format import MessageToDict
+        return MessageToDict(args)
+    return dict(args)
+
+
+# Prefer google-re2 for the service-name pattern when present: linear-time
+# DFA matching with no backtracking. The pattern below is simple enough that
+# stdlib re is a fine fallback — the win either way is collapsing the
+# urlparse + www-strip + split cascade into one match
+try:
+    import re2 as _re_service
+    RE2_AVAILABLE = True
+except ImportError:
+    _re_service = re
+    RE2_AVAILABLE = False
+
+# One pattern does the whole extraction: skip the scheme and www., greedily
+# consume leading host labels, and capture the second-to-last label (which
+# for "explore.jobs.netflix.net" is "netflix" and for "canva.com" is "canva")
+_SERVICE_RE = _re_service.compile(
+    r'^(?:https?://)?(?:www\.)?(?:[^/.:?#]+\.)*([^/.:?#]+)\.[^/.:?#]+(?:[/:?#]|$)'
+)
+
+# Compiled once instead of per extract_service_name call
+_WWW_RE = re.compile(r'^www\.', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
 def extract_service_name(url: str) -> str:
-    """Extract a human-readable service name from URL."""
-    from urllib.parse import urlparse
-    import re
-    
+    """Extract a human-readable service name from URL. Memoized since the
+    same URLs recur across events and workspaces."""
     try:
+        # Fast path: a single anchored match walks the URL once
+        match = _SERVICE_RE.match(url)
+        if match:
+            return match.group(1).capitalize()
+
+        # Dotless or otherwise odd inputs fall back to the original cascade
         parsed = urlparse(url)
         domain = parsed.netloc or parsed.path
-        
+
         # Remove www. prefix
-        domain = re.sub(r'^www\.', '', domain, flags=re.IGNORECASE)
-        
+        domain = _WWW_RE.sub('', domain)
+
         # Split by dots and get the main domain part (usually second-to-last)
         parts = domain.split('.')
         if len(parts) >= 2:
@@ -70,31 +170,64 @@ def extract_service_name(url: str) -> str:
         return "Unknown"
 
 
+# Representative events per workspace sent to Gemini; the workspaces already
+# summarize total time, so more events only inflate prompt tokens
+_EVENTS_PER_WORKSPACE = 3
+
+
+def _select_representative_events(events: List[Dict], workspaces: List[Dict]) -> List[Dict]:
+    """Pick the top events per workspace by duration, plus the last event
+    overall (needed for lastStop grounding). Bounds the prompt at ~15 events
+    regardless of session length."""
+    workspace_domains = {ws.get("label", "") for ws in workspaces}
+    by_domain: Dict[str, List[Dict]] = {}
+    for event in events:
+        domain = extract_domain(event.get("url", ""))
+        if domain in workspace_domains:
+            by_domain.setdefault(domain, []).append(event)
+
+    selected = []
+    for ws in workspaces:
+        domain_events = by_domain.get(ws.get("label", ""), [])
+        selected.extend(heapq.nlargest(
+            _EVENTS_PER_WORKSPACE,
+            domain_events,
+            key=lambda e: e.get("durationSec", 0)
+        ))
+
+    if events:
+        last_event = max(events, key=lambda e: e.get("ts", 0))
+        if last_event not in selected:
+            selected.append(last_event)
+
+    return selected
+
+
 def create_gemini_input(goal: str, events: List[Dict], workspaces: List[Dict], last_stop: Dict) -> str:
     """Create input string for Gemini analysis with enhanced context."""
-    from analyzer import extract_domain
-    
-    events_summary = []
-    for event in events:
-        url = event.get("url", "")
-        domain = extract_domain(url)
-        service_name = extract_service_name(url)
-        
-        events_summary.append({
+    # Single-pass comprehension: runs the loop in C and binds url once per
+    # event instead of repeating dict.get lookups
+    events_summary = [
+        {
             "url": url,
             "title": event.get("title", ""),
             "durationSec": event.get("durationSec", 0),
-            "domain": domain,
-            "service": service_name  # Add service name for better context
-        })
-    
+            "domain": extract_domain(url),
+            "service": extract_service_name(url)  # Add service name for better context
+        }
+        for event in _select_representative_events(events, workspaces)
+        for url in (event.get("url", ""),)
+    ]
+
     # Enhance workspaces with service names
     enhanced_workspaces = []
     for ws in workspaces:
         enhanced_ws = ws.copy()
         # Extract service names from top URLs
         service_names = [extract_service_name(url) for url in ws.get("topUrls", [])]
-        enhanced_ws["services"] = list(set(service_names))  # Unique service names
+        # dict.fromkeys dedups in one hash pass and keeps insertion order, so
+        # the prompt stays deterministic (and server-side prefix-cacheable)
+        enhanced_ws["services"] = list(dict.fromkeys(service_names))
         enhanced_workspaces.append(enhanced_ws)
     
     input_data = {
@@ -104,22 +237,51 @@ def create_gemini_input(goal: str, events: List[Dict], workspaces: List[Dict], l
         "lastStop": last_stop
     }
     
-    return json.dumps(input_data, indent=2)
+    # Compact encoding: indentation is pure whitespace cost in prompt tokens
+    return fastjson.dumps(input_data)
+
+
+# Strips leading/trailing markdown code fences in one pass
+_JSON_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
 
 
 def clean_json_response(response_text: str) -> str:
     """Extract JSON from response, removing markdown code blocks if present."""
-    # Remove markdown code blocks
-    response_text = response_text.strip()
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]
-    elif response_text.startswith("```"):
-        response_text = response_text[3:]
-    
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]
-    
-    return response_text.strip()
+    return _JSON_FENCE_RE.sub('', response_text).strip()
+
+
+def _consume_stream(response) -> str:
+    """Drain a streaming generate_content response into the full text.
+
+    Chunks without text (e.g. safety-blocked candidates) are skipped rather
+    than raising, mirroring the empty-response handling of the blocking path.
+    """
+    parts = []
+    for chunk in response:
+        text = getattr(chunk, 'text', None)
+        if text:
+            parts.append(text)
+    return ''.join(parts)
+
+
+# Constant prompt prefix built once at import; per-call work is a single
+# string concat, and the byte-identical prefix helps server-side prompt
+# caching
+_PROMPT_PREFIX = GEMINI_PROMPT + "\n\nInput:\n"
+
+
+# Models to try, in order. gemini-2.5-flash is faster and cheaper;
+# gemini-pro-latest is the fallback since gemini-pro is deprecated. The
+# fallback only triggers on model-not-found — GenerativeModel() itself
+# doesn't validate the name, so the old try/except around construction
+# never fired and would have hidden real errors (e.g. bad credentials)
+_MODEL_CANDIDATES = ('gemini-2.5-flash', 'gemini-pro-latest')
+
+
+def _is_model_not_found(error: Exception) -> bool:
+    """True if the API error means the requested model is unavailable."""
+    msg = str(error).lower()
+    return '404' in msg or 'not found' in msg or 'not supported' in msg
 
 
 def call_gemini(goal: str, events: List[Dict], workspaces: List[Dict], last_stop: Dict, api_key: Optional[str] = None, retry: bool = True) -> Dict[str, Any]:
@@ -146,53 +308,56 @@ def call_gemini(goal: str, events: List[Dict], workspaces: List[Dict], last_stop
         if not api_key:
             raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
     
-    # Configure Gemini
-    genai.configure(api_key=api_key)
-    # Use gemini-2.5-flash (faster, cheaper) or gemini-2.5-pro (more capable)
-    # gemini-pro is deprecated - use gemini-pro-latest as fallback
-    model_name = 'gemini-2.5-flash'
-    try:
-        model = genai.GenerativeModel(model_name)
-    except Exception:
-        # Fallback to latest available version
-        model = genai.GenerativeModel('gemini-pro-latest')
-    
     # Create input
     gemini_input = create_gemini_input(goal, events, workspaces, last_stop)
-    full_prompt = f"{GEMINI_PROMPT}\n\nInput:\n{gemini_input}"
-    
+    full_prompt = _PROMPT_PREFIX + gemini_input
+
     try:
-        # Call Gemini with low temperature
-        response = model.generate_content(
-            full_prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.3,
-                top_p=0.95,
-                top_k=40,
-            )
-        )
-        
-        # Check if response has text
-        if not hasattr(response, 'text') or not response.text:
+        # Call Gemini with low temperature. Streaming lets us accumulate text
+        # while the model is still generating, overlapping network time with
+        # client-side work instead of waiting for the full response.
+        # Models (cached across calls) are tried in order; only a
+        # model-not-found error moves on to the next candidate
+        response_text = None
+        for i, model_name in enumerate(_MODEL_CANDIDATES):
+            model = _get_model(api_key, model_name)
+            try:
+                response = model.generate_content(
+                    full_prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=0.3,
+                        top_p=0.95,
+                        top_k=40,
+                    ),
+                    stream=True,
+                )
+                response_text = _consume_stream(response)
+                break
+            except Exception as e:
+                if _is_model_not_found(e) and i + 1 < len(_MODEL_CANDIDATES):
+                    continue
+                raise
+
+        if not response_text:
             raise ValueError("Gemini returned empty response. This may happen with large prompts or rate limiting.")
-        
-        response_text = response.text
+
         cleaned_response = clean_json_response(response_text)
-        
+
         # Parse JSON
         try:
-            result = json.loads(cleaned_response)
+            result = fastjson.loads(cleaned_response)
             return result
         except json.JSONDecodeError as e:
             if retry:
                 # Retry with stricter instruction
                 retry_prompt = "Output only valid JSON.\n\n" + full_prompt
-                retry_response = model.generate_content(retry_prompt)
-                if not hasattr(retry_response, 'text') or not retry_response.text:
+                retry_response = model.generate_content(retry_prompt, stream=True)
+                retry_raw = _consume_stream(retry_response)
+                if not retry_raw:
                     raise ValueError("Gemini returned empty response on retry.")
-                retry_text = clean_json_response(retry_response.text)
+                retry_text = clean_json_response(retry_raw)
                 try:
-                    return json.loads(retry_text)
+                    return fastjson.loads(retry_text)
                 except json.JSONDecodeError as retry_error:
                     raise ValueError(
                         f"Failed to parse Gemini response as JSON after retry: {retry_error}\n"
@@ -218,81 +383,200 @@ def call_gemini(goal: str, events: List[Dict], workspaces: List[Dict], last_stop
             raise RuntimeError(f"Gemini API call failed: {error_msg}\nOriginal error type: {type(e).__name__}")
 
 
+async def call_gemini_async(goal: str, events: List[Dict], workspaces: List[Dict], last_stop: Dict, api_key: Optional[str] = None, retry: bool = True) -> Dict[str, Any]:
+    """
+    Async variant of call_gemini for concurrent session processing.
+
+    Uses generate_content_async so a backend can overlap many Gemini round
+    trips with asyncio.gather instead of blocking a thread per session. The
+    parse-failure retry is issued immediately from the same coroutine.
+    """
+    if not GEMINI_AVAILABLE:
+        raise ImportError("google-generativeai is not installed. Install it with: pip install google-generativeai")
+
+    if not api_key:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
+
+    gemini_input = create_gemini_input(goal, events, workspaces, last_stop)
+    full_prompt = _PROMPT_PREFIX + gemini_input
+
+    try:
+        response = None
+        for i, model_name in enumerate(_MODEL_CANDIDATES):
+            model = _get_model(api_key, model_name)
+            try:
+                response = await model.generate_content_async(
+                    full_prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        temperature=0.3,
+                        top_p=0.95,
+                        top_k=40,
+                    )
+                )
+                break
+            except Exception as e:
+                if _is_model_not_found(e) and i + 1 < len(_MODEL_CANDIDATES):
+                    continue
+                raise
+
+        if not hasattr(response, 'text') or not response.text:
+            raise ValueError("Gemini returned empty response. This may happen with large prompts or rate limiting.")
+
+        response_text = response.text
+        cleaned_response = clean_json_response(response_text)
+
+        try:
+            return fastjson.loads(cleaned_response)
+        except json.JSONDecodeError as e:
+            if retry:
+                retry_prompt = "Output only valid JSON.\n\n" + full_prompt
+                retry_response = await model.generate_content_async(retry_prompt)
+                if not hasattr(retry_response, 'text') or not retry_response.text:
+                    raise ValueError("Gemini returned empty response on retry.")
+                retry_text = clean_json_response(retry_response.text)
+                try:
+                    return fastjson.loads(retry_text)
+                except json.JSONDecodeError as retry_error:
+                    raise ValueError(
+                        f"Failed to parse Gemini response as JSON after retry: {retry_error}\n"
+                        f"Original response: {response_text}\n"
+                        f"Retry response: {retry_text}"
+                    )
+            else:
+                raise ValueError(f"Failed to parse Gemini response as JSON: {e}\nResponse: {response_text}")
+
+    except ValueError:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if "API key" in error_msg or "authentication" in error_msg.lower():
+            raise ValueError(f"Gemini API authentication failed: {error_msg}\nPlease check your GEMINI_API_KEY environment variable.")
+        elif "quota" in error_msg.lower() or "429" in error_msg:
+            raise RuntimeError(f"Gemini API rate limit exceeded: {error_msg}\nPlease wait and try again later.")
+        elif "500" in error_msg or "internal" in error_msg.lower():
+            raise RuntimeError(f"Gemini API server error: {error_msg}\nThis is a temporary issue, please try again.")
+        else:
+            raise RuntimeError(f"Gemini API call failed: {error_msg}\nOriginal error type: {type(e).__name__}")
+
+
+# The output schema is fixed, so the field spec below drives code
+# generation at import time: (field, isinstance expression, max length)
+_SCHEMA_FIELDS = (
+    ("goalInferred", "str", None),
+    ("workspaces", "list", 5),
+    ("lastStop", "dict", None),
+    ("resumeSummary", "str", None),
+    ("nextActions", "list", 5),
+    ("pendingDecisions", "list", 3),
+    ("aiRecap", "str", None),
+    ("aiActions", "list", None),
+    ("aiConfidenceScore", "(int, float)", None),
+    ("aiConfidenceLabel", "str", None),
+)
+
+
+def _compile_schema_check():
+    """Generate a straight-line checker for the fixed output schema.
+
+    Rather than looping over a field list and re-dispatching per entry on
+    every call, emit the checks unrolled — one membership test, isinstance,
+    and length limit per field as direct statements — and exec the source
+    once at import. Every validate_output call afterwards runs
+    branch-predictable straight-line code with no loop or reflection.
+    """
+    lines = ["def _check_schema(output):"]
+    for name, type_expr, max_len in _SCHEMA_FIELDS:
+        lines.append(f"    if {name!r} not in output:")
+        lines.append(f"        raise ValueError('Missing required field: {name}')")
+        lines.append(f"    if not isinstance(output[{name!r}], {type_expr}):")
+        lines.append(
+            f"        raise ValueError('{name} has wrong type: ' + type(output[{name!r}]).__name__)"
+        )
+        if max_len is not None:
+            lines.append(f"    n = len(output[{name!r}])")
+            lines.append(f"    if n > {max_len}:")
+            lines.append(
+                f"        raise ValueError(f'Too many {name}: {{n}} (max {max_len})')"
+            )
+    lines.append("    for ws in output['workspaces']:")
+    lines.append("        if 'label' not in ws or 'timeSec' not in ws or 'topUrls' not in ws:")
+    lines.append("            raise ValueError(f'Invalid workspace structure: {ws}')")
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<schema-check>", "exec"), namespace)
+    return namespace["_check_schema"]
+
+
+_check_schema = _compile_schema_check()
+
+
 def validate_output(output: Dict[str, Any], events: List[Dict]) -> bool:
     """
     Validate output against schema and constraints.
-    
+
     Returns:
         True if valid, raises ValueError if invalid
     """
-    # Check required fields
-    required_fields = [
-        "goalInferred",
-        "workspaces",
-        "lastStop",
-        "resumeSummary",
-        "nextActions",
-        "pendingDecisions",
-        "aiRecap",
-        "aiActions",
-        "aiConfidenceScore",
-        "aiConfidenceLabel",
-    ]
-    for field in required_fields:
-        if field not in output:
-            raise ValueError(f"Missing required field: {field}")
-    
-    # Validate workspaces (max 5)
+    # Field presence, types, and length limits: specialized straight-line
+    # checker generated from _SCHEMA_FIELDS at import
+    _check_schema(output)
     workspaces = output["workspaces"]
-    if len(workspaces) > 5:
-        raise ValueError(f"Too many workspaces: {len(workspaces)} (max 5)")
-    
-    for ws in workspaces:
-        if not all(key in ws for key in ["label", "timeSec", "topUrls"]):
-            raise ValueError(f"Invalid workspace structure: {ws}")
-    
-    # Validate nextActions (max 5, must start with verb)
-    next_actions = output["nextActions"]
-    if len(next_actions) > 5:
-        raise ValueError(f"Too many nextActions: {len(next_actions)} (max 5)")
-    
-    # Validate pendingDecisions (max 3)
-    pending_decisions = output["pendingDecisions"]
-    if len(pending_decisions) > 3:
-        raise ValueError(f"Too many pendingDecisions: {len(pending_decisions)} (max 3)")
-    
-    # Validate aiRecap (2-3 sentences)
+
+    # Validate aiRecap (2-3 sentences). C-level counts instead of chained
+    # replace/split passes and a throwaway list; an unterminated trailing
+    # sentence still counts
     ai_recap = output["aiRecap"]
-    sentence_count = len([s for s in ai_recap.replace("?", ".").replace("!", ".").split('.') if s.strip()])
+    sentence_count = ai_recap.count('.') + ai_recap.count('?') + ai_recap.count('!')
+    if ai_recap.strip() and not ai_recap.rstrip().endswith(('.', '?', '!')):
+        sentence_count += 1
     if sentence_count < 2 or sentence_count > 3:
         raise ValueError("aiRecap must be 2-3 sentences")
 
+    # One pass over events builds both lookup sets
+    input_urls = set()
+    input_domains = set()
+    for event in events:
+        url = event.get("url")
+        if url:
+            input_urls.add(url)
+            input_domains.add(extract_domain(url))
+
     # Validate aiActions (exactly 3, each mentions a domain)
     ai_actions = output["aiActions"]
     if len(ai_actions) != 3:
         raise ValueError("aiActions must have exactly 3 items")
-    input_domains = {extract_domain(event.get("url", "")) for event in events if event.get("url")}
+    domains_tuple = tuple(d for d in input_domains if d)
     for action in ai_actions:
-        if not any(domain and domain in action for domain in input_domains):
+        if not any(domain in action for domain in domains_tuple):
             raise ValueError(f"aiAction does not mention a known domain: {action}")
-    
+
     # Validate lastStop.url is in input events
     last_stop_url = output["lastStop"].get("url", "")
-    input_urls = {event.get("url", "") for event in events}
     if last_stop_url and last_stop_url not in input_urls:
         raise ValueError(f"lastStop.url '{last_stop_url}' not found in input events")
     
-    # Validate all workspace URLs are in input events
-    for ws in workspaces:
-        for url in ws.get("topUrls", []):
-            if url and url not in input_urls:
-                raise ValueError(f"Workspace URL '{url}' not found in input events")
-    
+    # Validate all workspace URLs are in input events; a generator fed to
+    # next() runs the scan in C and stops at the first unknown URL
+    bad_url = next(
+        (url for ws in workspaces for url in ws.get("topUrls") or () if url and url not in input_urls),
+        None
+    )
+    if bad_url:
+        raise ValueError(f"Workspace URL '{bad_url}' not found in input events")
+
     return True
 
 
+# Fields normalize_ai_fields may need to backfill; a fully-populated
+# response (the common case) short-circuits past all the branches
+_AI_FIELDS = ("aiRecap", "aiActions", "resumeSummary", "nextActions", "aiConfidenceScore", "aiConfidenceLabel")
+
+
 def normalize_ai_fields(output: Dict[str, Any]) -> Dict[str, Any]:
     """Ensure AI fields are present and consistent with legacy fields."""
+    if all(field in output for field in _AI_FIELDS):
+        return output
     if "aiRecap" not in output and output.get("resumeSummary"):
         output["aiRecap"] = output.get("resumeSummary", "")
     if "aiActions" not in output and output.get("nextActions"):
@@ -345,8 +629,36 @@ def analyzeSessionWithGemini(goal: str, eventsWithDuration: Dict, api_key: Optio
             print(f"Warning: Gemini analysis failed ({e}), falling back to basic analysis")
             # Fall through to basic analysis
     
-    # Fallback to basic analysis (no Gemini)
-    return analyzeSession(goal, eventsWithDuration)
+    # Fallback to basic analysis (no Gemini); reuse the grouping done above
+    return analyzeSession(goal, eventsWithDuration, _precomputed=(domain_data, workspaces, last_stop))
+
+
+async def analyzeSessionWithGeminiAsync(goal: str, eventsWithDuration: Dict, api_key: Optional[str] = None, use_gemini: bool = True) -> Dict[str, Any]:
+    """
+    Async variant of analyzeSessionWithGemini.
+
+    Lets a backend process many sessions concurrently with asyncio.gather
+    while each awaits its Gemini round trip.
+    """
+    events = eventsWithDuration.get("events", [])
+
+    if not events:
+        return analyzeSession(goal, eventsWithDuration)
+
+    domain_data = group_events_by_domain(events)
+    workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
+    last_stop = get_last_stop(events)
+
+    if use_gemini and GEMINI_AVAILABLE:
+        try:
+            gemini_result = await call_gemini_async(goal, events, workspaces, last_stop, api_key=api_key)
+            gemini_result = normalize_ai_fields(gemini_result)
+            validate_output(gemini_result, events)
+            return gemini_result
+        except Exception as e:
+            print(f"Warning: Gemini analysis failed ({e}), falling back to basic analysis")
+
+    return analyzeSession(goal, eventsWithDuration, _precomputed=(domain_data, workspaces, last_stop))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,45 @@
 """
 Enhanced analyzer with Gemini AI integration and tool use (calendar, email).
 """
+import asyncio
+import atexit
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
-from analyzer import analyzeSession, group_events_by_domain, create_workspaces_from_domains, get_last_stop
+from analyzer import analyzeSession, create_workspaces_from_domains, extract_domain
+from gemini_analyzer import (
+    extract_service_name,
+    clean_json_response,
+    _function_call_args,
+    _get_model,
+    _get_tools_config,
+)
+import fastjson
+from llm_cache import default_cache
+from programmatic_runner import PlanExecutionError, extract_python_plan, run_plan
+from semantic_cache import default_semantic_cache, EMBEDDINGS_AVAILABLE
+
+# Non-blocking logging for the fallback/skip paths: emitting a record is
+# just a queue put, and a background QueueListener does the actual stream
+# I/O — so concurrent sessions never serialize on the stdout/stderr lock
+# the way bare print() calls do
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    logger.setLevel(logging.INFO)
+    _log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+    _log_listener.start()
+    # Drain whatever is still queued when the process exits; the listener
+    # thread is a daemon and would otherwise drop trailing records
+    atexit.register(_log_listener.stop)
 
 # Import tools
 try:
@@ -14,7 +49,7 @@ try:
     TOOLS_AVAILABLE = True
 except ImportError:
     TOOLS_AVAILABLE = False
-    print("Warning: Tools not available. Install required dependencies.")
+    logger.warning("Tools not available. Install required dependencies.")
 
 # Try to import Gemini (will fail gracefully if not installed)
 try:
@@ -22,7 +57,15 @@ try:
     GEMINI_AVAILABLE = True
 except ImportError:
     GEMINI_AVAILABLE = False
-    print("Warning: google-generativeai not installed. Gemini features will be disabled.")
+    logger.warning("google-generativeai not installed. Gemini features will be disabled.")
+
+# The Batch API lives in the newer google-genai client; batch mode is simply
+# unavailable when only google-generativeai is installed
+try:
+    from google import genai as genai_client
+    BATCH_API_AVAILABLE = True
+except ImportError:
+    BATCH_API_AVAILABLE = False
 
 
 GEMINI_PROMPT = """You are FocusForge, an AI agent that analyzes browser activity from a single focus session. You have access to tools for calendar and email to provide better context and suggestions.
@@ -42,6 +85,12 @@ TOOL USE GUIDELINES:
 - Use draft_email when user's activity suggests they need to send an email (always draft first, never send directly)
 - Only use tools when they add value to the analysis - don't call tools unnecessarily
 
+PROGRAMMATIC TOOL PLANS:
+- Instead of individual tool calls, you may respond with a fenced ```python block that calls the tools as functions (e.g. get_upcoming_events(), get_recent_emails()), filters or combines their output with comprehensions, and assigns the final value to a variable named result
+- The block is executed locally and only the result value is sent back to you; use this when you need several tool results at once
+
+Input format: each entry in "events" has url, title, and t (seconds spent). Domains and service names are aggregated on the "workspaces" entries.
+
 Other constraints: limit workspaces to max 5. nextActions max 5 and each starts with a verb. pendingDecisions max 3. Do not invent websites, events, or facts not in the input. lastStop.url must be present in the input events. Labels should be short and human-friendly.
 
 Return ONLY valid JSON that matches the schema below. No backticks. No explanations.
@@ -61,57 +110,117 @@ Schema:
 }"""
 
 
-def extract_service_name(url: str) -> str:
-    """Extract a human-readable service name from URL."""
-    from urllib.parse import urlparse
-    import re
-    
-    try:
-        parsed = urlparse(url)
-        domain = parsed.netloc or parsed.path
-        
-        # Remove www. prefix
-        domain = re.sub(r'^www\.', '', domain, flags=re.IGNORECASE)
-        
-        # Split by dots and get the main domain part (usually second-to-last)
-        parts = domain.split('.')
-        if len(parts) >= 2:
-            main_part = parts[-2] if len(parts) > 2 else parts[0]
-        else:
-            main_part = parts[0] if parts else "unknown"
-        
-        # Capitalize first letter
-        return main_part.capitalize() if main_part else "Unknown"
-    except Exception:
-        return "Unknown"
+# The model cache, tools proto cache, and configure state live in
+# gemini_analyzer and are shared with every other Gemini caller; see
+# _get_model / _get_tools_config / _function_call_args imported above.
 
+# The default calendar+email registry is identical for every call; build it
+# once on first use instead of re-registering the tools per session
+_REGISTRY_LOCK = threading.Lock()
+_DEFAULT_REGISTRY: Optional["ToolRegistry"] = None
+
+
+def _get_default_registry() -> Optional["ToolRegistry"]:
+    """Get (or create) the shared calendar+email tool registry."""
+    global _DEFAULT_REGISTRY
+    if not TOOLS_AVAILABLE:
+        return None
+    with _REGISTRY_LOCK:
+        if _DEFAULT_REGISTRY is None:
+            registry = ToolRegistry()
+            for tool in create_calendar_tools():
+                registry.register(tool)
+            for tool in create_email_tool():
+                registry.register(tool)
+            _DEFAULT_REGISTRY = registry
+        return _DEFAULT_REGISTRY
+
+
+def build_session_context(events: List[Dict]) -> tuple:
+    """Build (domain_data, workspaces, last_stop, events_summary) in one
+    sweep over the events.
+
+    The enhanced analyzer used to run group_events_by_domain, then
+    create_workspaces_from_domains, then get_last_stop, then the summary
+    comprehension in create_gemini_input — four passes over the same list.
+    The per-event work is identical either way; fusing it into one loop cuts
+    the memory traffic to a single read of the events.
+    """
+    domain_data: Dict[str, Dict] = {}
+    # Sessions revisit the same URLs; parse each distinct URL only once
+    domain_cache: Dict[str, str] = {}
+    events_summary: List[Dict] = []
+    last_event: Optional[Dict] = None
+    last_ts: Optional[int] = None
 
-def create_gemini_input(goal: str, events: List[Dict], workspaces: List[Dict], last_stop: Dict) -> str:
-    """Create input string for Gemini analysis with enhanced context."""
-    from analyzer import extract_domain
-    
-    events_summary = []
     for event in events:
         url = event.get("url", "")
-        domain = extract_domain(url)
-        service_name = extract_service_name(url)
-        
+        duration = event.get("durationSec", 0)
+        domain = domain_cache.get(url)
+        if domain is None:
+            domain = domain_cache[url] = extract_domain(url)
+
+        bucket = domain_data.get(domain)
+        if bucket is None:
+            bucket = domain_data[domain] = {"timeSec": 0, "urls": {}}
+        bucket["timeSec"] += duration
+        bucket["urls"][url] = bucket["urls"].get(url, 0) + duration
+
+        # Strict > keeps the first event on tied timestamps, matching
+        # max(events, key=...) in get_last_stop
+        ts = event.get("ts", 0)
+        if last_ts is None or ts > last_ts:
+            last_ts = ts
+            last_event = event
+
         events_summary.append({
             "url": url,
             "title": event.get("title", ""),
-            "durationSec": event.get("durationSec", 0),
-            "domain": domain,
-            "service": service_name
+            "t": duration
         })
-    
-    # Enhance workspaces with service names
-    enhanced_workspaces = []
-    for ws in workspaces:
-        enhanced_ws = ws.copy()
-        service_names = [extract_service_name(url) for url in ws.get("topUrls", [])]
-        enhanced_ws["services"] = list(set(service_names))
-        enhanced_workspaces.append(enhanced_ws)
-    
+
+    # create_workspaces_from_domains is already a heap select over the
+    # aggregated domains (O(D log 5), not a full sort)
+    workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
+
+    if last_event is None:
+        last_stop = {"label": "Unknown", "url": ""}
+    else:
+        url = last_event.get("url", "")
+        title = last_event.get("title", "")
+        last_stop = {"label": title or extract_domain(url) or "Unknown", "url": url}
+
+    return domain_data, workspaces, last_stop, events_summary
+
+
+def create_gemini_input(goal: str, events: List[Dict], workspaces: List[Dict], last_stop: Dict,
+                        events_summary: Optional[List[Dict]] = None) -> str:
+    """Create input string for Gemini analysis with enhanced context.
+
+    events_summary, when provided by build_session_context, is used as-is;
+    otherwise it is derived here.
+    """
+    # Minimal per-event payload: domain and service are derivable from the
+    # url (and already aggregated on the workspaces), so shipping them per
+    # event only inflates prompt tokens linearly in the session length. The
+    # short "t" key trims tokenization cost further
+    if events_summary is None:
+        events_summary = [
+            {
+                "url": event.get("url", ""),
+                "title": event.get("title", ""),
+                "t": event.get("durationSec", 0)
+            }
+            for event in events
+        ]
+
+    # {**ws, ...} merges in one allocation; dict.fromkeys dedups the service
+    # names in one hash pass without reordering them
+    enhanced_workspaces = [
+        {**ws, "services": list(dict.fromkeys(extract_service_name(url) for url in ws.get("topUrls", [])))}
+        for ws in workspaces
+    ]
+
     input_data = {
         "goal": goal,
         "events": events_summary,
@@ -119,21 +228,14 @@ def create_gemini_input(goal: str, events: List[Dict], workspaces: List[Dict], l
         "lastStop": last_stop
     }
     
-    return json.dumps(input_data, indent=2)
+    # Compact encoding via the fastest available codec: indentation is pure
+    # whitespace cost in prompt tokens
+    return fastjson.dumps(input_data)
 
 
-def clean_json_response(response_text: str) -> str:
-    """Extract JSON from response, removing markdown code blocks if present."""
-    response_text = response_text.strip()
-    if response_text.startswith("```json"):
-        response_text = response_text[7:]
-    elif response_text.startswith("```"):
-        response_text = response_text[3:]
-    
-    if response_text.endswith("```"):
-        response_text = response_text[:-3]
-    
-    return response_text.strip()
+# Constant prompt prefix built once at import; per-call work is a single
+# string concat
+_PROMPT_PREFIX = GEMINI_PROMPT + "\n\nInput:\n"
 
 
 def execute_tool_call(tool_name: str, arguments: Dict[str, Any], tool_registry: ToolRegistry) -> Dict[str, Any]:
@@ -155,12 +257,13 @@ def call_gemini_with_tools(
     workspaces: List[Dict], 
     last_stop: Dict, 
     tool_registry: Optional[ToolRegistry] = None,
-    api_key: Optional[str] = None, 
-    max_tool_iterations: int = 3
+    api_key: Optional[str] = None,
+    max_tool_iterations: int = 3,
+    events_summary: Optional[List[Dict]] = None
 ) -> Dict[str, Any]:
     """
     Call Gemini API with tool support.
-    
+
     Args:
         goal: User's goal
         events: List of events
@@ -169,7 +272,8 @@ def call_gemini_with_tools(
         tool_registry: Registry of available tools
         api_key: Gemini API key
         max_tool_iterations: Maximum number of tool call iterations
-    
+        events_summary: Optional pre-built summary from build_session_context
+
     Returns:
         Parsed JSON response
     """
@@ -181,28 +285,49 @@ def call_gemini_with_tools(
         if not api_key:
             raise ValueError("Gemini API key not provided.")
     
-    # Configure Gemini
-    genai.configure(api_key=api_key)
+    # Configure Gemini (cached across calls)
     model_name = 'gemini-2.0-flash-exp'  # Use model that supports function calling
     try:
-        model = genai.GenerativeModel(model_name)
+        model = _get_model(api_key, model_name)
     except Exception:
         # Fallback
-        model = genai.GenerativeModel('gemini-1.5-pro')
-    
-    # Prepare tools for Gemini
+        model = _get_model(api_key, 'gemini-1.5-pro')
+
+    # Prepare tools for Gemini (proto cached per function set)
     tools_config = None
+    tools_fingerprint: List[str] = []
     if tool_registry and TOOLS_AVAILABLE:
         functions = tool_registry.get_gemini_functions()
         if functions:
-            tools_config = genai.protos.Tool(
-                function_declarations=[genai.protos.FunctionDeclaration(**f) for f in functions]
-            )
-    
+            tools_config = _get_tools_config(functions)
+            tools_fingerprint = sorted(f["name"] for f in functions)
+
     # Create input
-    gemini_input = create_gemini_input(goal, events, workspaces, last_stop)
-    full_prompt = f"{GEMINI_PROMPT}\n\nInput:\n{gemini_input}"
-    
+    gemini_input = create_gemini_input(goal, events, workspaces, last_stop, events_summary)
+    full_prompt = _PROMPT_PREFIX + gemini_input
+
+    # Identical payloads (test loops, reloads, retries) are served from the
+    # exact-match cache without a network round-trip
+    cache_key = default_cache.cache_key(
+        model_name, GEMINI_PROMPT, gemini_input, 0.3, tools_fingerprint
+    )
+    cached = default_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Near-duplicate sessions (reworded goal, shifted timestamps) are served
+    # from the semantic cache when an embedded neighbour is close enough AND
+    # its context chain (domains, lastStop host, goal tokens) checks out
+    session_context = {
+        "goal": goal,
+        "domains": sorted({extract_domain(e.get("url", "")) for e in events}),
+        "last_stop_host": extract_domain(last_stop.get("url", "")),
+    }
+    if EMBEDDINGS_AVAILABLE:
+        semantic_hit = default_semantic_cache.lookup(gemini_input, context=session_context)
+        if semantic_hit is not None:
+            return semantic_hit
+
     # Conversation history for tool calls
     conversation = [{"role": "user", "parts": [full_prompt]}]
     
@@ -221,15 +346,37 @@ def call_gemini_with_tools(
                     )
                 )
             else:
-                response = model.generate_content(
+                # Without tools there's nothing to dispatch mid-response, so
+                # stream and accumulate: transfer overlaps generation instead
+                # of blocking until the last token
+                stream = model.generate_content(
                     full_prompt,
                     generation_config=genai.types.GenerationConfig(
                         temperature=0.3,
                         top_p=0.95,
                         top_k=40,
-                    )
+                    ),
+                    stream=True,
                 )
-            
+                buf = []
+                for chunk in stream:
+                    text = getattr(chunk, 'text', None)
+                    if text:
+                        buf.append(text)
+                response_text = ''.join(buf)
+                if not response_text:
+                    raise ValueError("Gemini returned empty response")
+
+                cleaned_response = clean_json_response(response_text)
+                try:
+                    result = json.loads(cleaned_response)
+                    default_cache.set(cache_key, result)
+                    if EMBEDDINGS_AVAILABLE:
+                        default_semantic_cache.store(gemini_input, result, context=session_context)
+                    return result
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Failed to parse Gemini response as JSON: {e}\nResponse: {response_text}")
+
             # Check for function calls
             if hasattr(response, 'candidates') and response.candidates:
                 candidate = response.candidates[0]
@@ -242,19 +389,43 @@ def call_gemini_with_tools(
                     function_calls = [p for p in parts if hasattr(p, 'function_call')]
                     
                     if function_calls:
-                        # Execute tool calls
-                        tool_results = []
+                        # Decode each call and key it on (tool, sorted args):
+                        # the model sometimes asks the same question twice in
+                        # one turn, and duplicates should hit the calendar or
+                        # email API once
+                        decoded = []
                         for func_call in function_calls:
                             tool_name = func_call.function_call.name
-                            arguments = json.loads(func_call.function_call.args)
-                            
-                            result = execute_tool_call(tool_name, arguments, tool_registry)
-                            tool_results.append({
+                            arguments = _function_call_args(func_call.function_call)
+                            sig = tool_name + '|' + json.dumps(arguments, sort_keys=True)
+                            decoded.append((tool_name, arguments, sig))
+
+                        # Execute each distinct call once. Handlers are
+                        # blocking I/O (calendar/email HTTP), so independent
+                        # calls run on a thread pool: total latency is the
+                        # slowest call, not the sum
+                        unique = {sig: (tool_name, arguments) for tool_name, arguments, sig in decoded}
+
+                        def run_tool_call(item):
+                            sig, (tool_name, arguments) = item
+                            return sig, execute_tool_call(tool_name, arguments, tool_registry)
+
+                        if len(unique) > 1:
+                            with ThreadPoolExecutor(max_workers=min(len(unique), 8)) as pool:
+                                turn_cache = dict(pool.map(run_tool_call, unique.items()))
+                        else:
+                            turn_cache = dict(map(run_tool_call, unique.items()))
+
+                        # One function_response per requested call, in order
+                        tool_results = [
+                            {
                                 "function_response": {
                                     "name": tool_name,
-                                    "response": result
+                                    "response": turn_cache[sig]
                                 }
-                            })
+                            }
+                            for tool_name, _arguments, sig in decoded
+                        ]
                         
                         # Add tool results to conversation
                         conversation.append({
@@ -283,12 +454,35 @@ def call_gemini_with_tools(
                 response_text = ' '.join(text_parts)
             else:
                 raise ValueError("Gemini returned empty response")
-            
+
+            # Programmatic tool plan: execute it locally and send back only
+            # the final result for one synthesis turn, instead of one model
+            # round-trip per tool call
+            if tool_registry and TOOLS_AVAILABLE:
+                plan = extract_python_plan(response_text)
+                if plan is not None:
+                    try:
+                        plan_result = run_plan(plan, tool_registry)
+                    except PlanExecutionError as e:
+                        plan_result = {"error": str(e)}
+                    conversation.append({"role": "model", "parts": [response_text]})
+                    conversation.append({
+                        "role": "user",
+                        "parts": [
+                            "Plan result: " + json.dumps(plan_result, default=str)
+                            + "\nNow return ONLY the final JSON matching the schema."
+                        ]
+                    })
+                    continue
+
             cleaned_response = clean_json_response(response_text)
             
             # Parse JSON
             try:
                 result = json.loads(cleaned_response)
+                default_cache.set(cache_key, result)
+                if EMBEDDINGS_AVAILABLE:
+                    default_semantic_cache.store(gemini_input, result, context=session_context)
                 return result
             except json.JSONDecodeError as e:
                 raise ValueError(f"Failed to parse Gemini response as JSON: {e}\nResponse: {response_text}")
@@ -302,6 +496,240 @@ def call_gemini_with_tools(
     raise RuntimeError("Maximum tool call iterations reached")
 
 
+# Concurrent tool calls per turn in the async path
+_ASYNC_TOOL_CONCURRENCY = 8
+
+
+async def call_gemini_with_tools_async(
+    goal: str,
+    events: List[Dict],
+    workspaces: List[Dict],
+    last_stop: Dict,
+    tool_registry: Optional[ToolRegistry] = None,
+    api_key: Optional[str] = None,
+    max_tool_iterations: int = 3,
+    events_summary: Optional[List[Dict]] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of call_gemini_with_tools for concurrent backlog processing.
+
+    Uses generate_content_async so many sessions' Gemini round trips overlap
+    on one event loop (see analyzeSessionsConcurrently); tool handlers are
+    blocking clients, so a turn's distinct calls run via asyncio.to_thread
+    under a small semaphore. Shares the exact-match and semantic caches with
+    the sync path.
+    """
+    if not GEMINI_AVAILABLE:
+        raise ImportError("google-generativeai is not installed.")
+
+    if not api_key:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("Gemini API key not provided.")
+
+    model_name = 'gemini-2.0-flash-exp'
+    try:
+        model = _get_model(api_key, model_name)
+    except Exception:
+        model = _get_model(api_key, 'gemini-1.5-pro')
+
+    tools_config = None
+    tools_fingerprint: List[str] = []
+    if tool_registry and TOOLS_AVAILABLE:
+        functions = tool_registry.get_gemini_functions()
+        if functions:
+            tools_config = _get_tools_config(functions)
+            tools_fingerprint = sorted(f["name"] for f in functions)
+
+    gemini_input = create_gemini_input(goal, events, workspaces, last_stop, events_summary)
+    full_prompt = _PROMPT_PREFIX + gemini_input
+
+    cache_key = default_cache.cache_key(
+        model_name, GEMINI_PROMPT, gemini_input, 0.3, tools_fingerprint
+    )
+    cached = default_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    session_context = {
+        "goal": goal,
+        "domains": sorted({extract_domain(e.get("url", "")) for e in events}),
+        "last_stop_host": extract_domain(last_stop.get("url", "")),
+    }
+    if EMBEDDINGS_AVAILABLE:
+        semantic_hit = default_semantic_cache.lookup(gemini_input, context=session_context)
+        if semantic_hit is not None:
+            return semantic_hit
+
+    conversation = [{"role": "user", "parts": [full_prompt]}]
+    generation_config = genai.types.GenerationConfig(
+        temperature=0.3,
+        top_p=0.95,
+        top_k=40,
+    )
+
+    for iteration in range(max_tool_iterations):
+        try:
+            if tools_config:
+                response = await model.generate_content_async(
+                    conversation,
+                    tools=[tools_config],
+                    generation_config=generation_config,
+                )
+            else:
+                response = await model.generate_content_async(
+                    full_prompt,
+                    generation_config=generation_config,
+                )
+
+            if hasattr(response, 'candidates') and response.candidates:
+                candidate = response.candidates[0]
+                if hasattr(candidate, 'content') and candidate.content:
+                    parts = candidate.content.parts
+                    function_calls = [p for p in parts if getattr(p, 'function_call', None) is not None]
+
+                    if function_calls:
+                        decoded = []
+                        for func_call in function_calls:
+                            tool_name = func_call.function_call.name
+                            arguments = _function_call_args(func_call.function_call)
+                            sig = tool_name + '|' + json.dumps(arguments, sort_keys=True)
+                            decoded.append((tool_name, arguments, sig))
+
+                        unique = {sig: (tool_name, arguments) for tool_name, arguments, sig in decoded}
+                        semaphore = asyncio.Semaphore(_ASYNC_TOOL_CONCURRENCY)
+
+                        async def run_tool_call(sig, tool_name, arguments):
+                            async with semaphore:
+                                result = await asyncio.to_thread(
+                                    execute_tool_call, tool_name, arguments, tool_registry
+                                )
+                            return sig, result
+
+                        turn_cache = dict(await asyncio.gather(*[
+                            run_tool_call(sig, tool_name, arguments)
+                            for sig, (tool_name, arguments) in unique.items()
+                        ]))
+
+                        tool_results = [
+                            {
+                                "function_response": {
+                                    "name": tool_name,
+                                    "response": turn_cache[sig]
+                                }
+                            }
+                            for tool_name, _arguments, sig in decoded
+                        ]
+
+                        conversation.append({"role": "model", "parts": parts})
+                        conversation.append({
+                            "role": "user",
+                            "parts": [genai.protos.Part(function_response=r["function_response"]) for r in tool_results]
+                        })
+                        continue
+
+            if hasattr(response, 'text') and response.text:
+                response_text = response.text
+            elif hasattr(response, 'candidates') and response.candidates:
+                text_parts = []
+                for candidate in response.candidates:
+                    if hasattr(candidate, 'content') and candidate.content:
+                        for part in candidate.content.parts:
+                            if hasattr(part, 'text'):
+                                text_parts.append(part.text)
+                response_text = ' '.join(text_parts)
+            else:
+                raise ValueError("Gemini returned empty response")
+
+            if tool_registry and TOOLS_AVAILABLE:
+                plan = extract_python_plan(response_text)
+                if plan is not None:
+                    try:
+                        plan_result = run_plan(plan, tool_registry)
+                    except PlanExecutionError as e:
+                        plan_result = {"error": str(e)}
+                    conversation.append({"role": "model", "parts": [response_text]})
+                    conversation.append({
+                        "role": "user",
+                        "parts": [
+                            "Plan result: " + json.dumps(plan_result, default=str)
+                            + "\nNow return ONLY the final JSON matching the schema."
+                        ]
+                    })
+                    continue
+
+            cleaned_response = clean_json_response(response_text)
+            try:
+                result = json.loads(cleaned_response)
+                default_cache.set(cache_key, result)
+                if EMBEDDINGS_AVAILABLE:
+                    default_semantic_cache.store(gemini_input, result, context=session_context)
+                return result
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Failed to parse Gemini response as JSON: {e}\nResponse: {response_text}")
+
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Gemini API call failed: {e}")
+
+    raise RuntimeError("Maximum tool call iterations reached")
+
+
+async def analyzeSessionsConcurrently(sessions: List[Dict], api_key: Optional[str] = None) -> List[Any]:
+    """
+    Analyze a backlog of sessions with their Gemini calls overlapped.
+
+    Each session is a dict with "goal" and "events" keys. All Gemini round
+    trips share the event loop (and, via the cached model, one gRPC
+    channel), so total wall time approaches the slowest call rather than
+    the sum. Returns results in input order; a failed session yields its
+    exception (asyncio.gather with return_exceptions=True).
+    """
+    async def analyze_one(session):
+        goal = session.get("goal", "")
+        events = session.get("events", [])
+        if not events:
+            return analyzeSession(goal, session)
+
+        domain_data, workspaces, last_stop, events_summary = build_session_context(events)
+        try:
+            from gemini_analyzer import normalize_ai_fields, validate_output
+            result = await call_gemini_with_tools_async(
+                goal, events, workspaces, last_stop, api_key=api_key,
+                events_summary=events_summary
+            )
+            result = normalize_ai_fields(result)
+            validate_output(result, events)
+            return result
+        except Exception as e:
+            logger.warning("Gemini analysis failed (%s), falling back to basic analysis", e)
+            return analyzeSession(goal, {"events": events}, _precomputed=(domain_data, workspaces, last_stop))
+
+    return await asyncio.gather(*[analyze_one(s) for s in sessions], return_exceptions=True)
+
+
+# DIRECT-path thresholds: sessions this small get nothing from the LLM
+_DIRECT_MAX_EVENTS = 2
+_DIRECT_MIN_TOTAL_SEC = 30
+
+
+def _direct_path_reason(goal: str, events: List[Dict]) -> Optional[str]:
+    """Return why this session should skip Gemini, or None if it shouldn't.
+
+    Trivial sessions — a couple of events, seconds of activity, or a single
+    domain — produce the same output from the basic analysis as from the
+    LLM, so spending an API call (and tool registry setup) on them is waste.
+    """
+    if len(events) <= _DIRECT_MAX_EVENTS:
+        return f"only {len(events)} events"
+    if sum(e.get("durationSec", 0) for e in events) < _DIRECT_MIN_TOTAL_SEC:
+        return f"under {_DIRECT_MIN_TOTAL_SEC}s of total activity"
+    if len({extract_domain(e.get("url", "")) for e in events}) == 1:
+        return "single-domain session"
+    return None
+
+
 def analyzeSessionWithGeminiAndTools(
     goal: str, 
     eventsWithDuration: Dict, 
@@ -323,33 +751,31 @@ def analyzeSessionWithGeminiAndTools(
         Dict matching the required schema
     """
     events = eventsWithDuration.get("events", [])
-    
+
     if not events:
         return analyzeSession(goal, eventsWithDuration)
-    
-    # Step 1: Do basic domain grouping first
-    domain_data = group_events_by_domain(events)
-    workspaces = create_workspaces_from_domains(domain_data, max_workspaces=5)
-    last_stop = get_last_stop(events)
-    
+
+    # DIRECT path: trivial sessions skip Gemini (and tool setup) entirely
+    direct_reason = _direct_path_reason(goal, events)
+    if direct_reason is not None:
+        logger.info("Skipping Gemini (%s), using basic analysis", direct_reason)
+        return analyzeSession(goal, eventsWithDuration)
+
+    # Step 1: One fused pass builds the grouping, workspaces, last stop, and
+    # the per-event prompt summary together
+    domain_data, workspaces, last_stop, events_summary = build_session_context(events)
+
     # Step 2: Enhance with Gemini if available
     if use_gemini and GEMINI_AVAILABLE:
         try:
-            # Set up tool registry if tools are enabled
-            tool_registry = None
-            if use_tools and TOOLS_AVAILABLE:
-                tool_registry = ToolRegistry()
-                # Register calendar tools
-                for tool in create_calendar_tools():
-                    tool_registry.register(tool)
-                # Register email tools
-                for tool in create_email_tool():
-                    tool_registry.register(tool)
-            
+            # Shared tool registry if tools are enabled
+            tool_registry = _get_default_registry() if use_tools else None
+
             gemini_result = call_gemini_with_tools(
-                goal, events, workspaces, last_stop, 
+                goal, events, workspaces, last_stop,
                 tool_registry=tool_registry,
-                api_key=api_key
+                api_key=api_key,
+                events_summary=events_summary
             )
             
             # Validate the result (import from original file)
@@ -359,11 +785,116 @@ def analyzeSessionWithGeminiAndTools(
             
             return gemini_result
         except Exception as e:
-            print(f"Warning: Gemini analysis with tools failed ({e}), falling back to basic analysis")
+            logger.warning("Gemini analysis with tools failed (%s), falling back to basic analysis", e)
             # Fall through to basic analysis
-    
-    # Fallback to basic analysis
-    return analyzeSession(goal, eventsWithDuration)
+
+    # Fallback to basic analysis, reusing the fused pass's results
+    return analyzeSession(goal, eventsWithDuration, _precomputed=(domain_data, workspaces, last_stop))
+
+
+# Batch mode: below this many sessions the interactive path is faster than
+# waiting on a batch job
+_BATCH_THRESHOLD = 4
+_BATCH_POLL_INTERVAL_SEC = 30
+_BATCH_TERMINAL_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED")
+
+
+def _batch_enabled() -> bool:
+    """Batch submission is opt-in: it trades up to 24h of latency for a flat
+    token discount, which only makes sense for offline backlogs."""
+    return os.getenv("FOCUSFORGE_BATCH_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def analyzeSessionsBatch(sessions: List[Dict], api_key: Optional[str] = None) -> List[Dict]:
+    """
+    Analyze many sessions as one Gemini Batch API job.
+
+    Each session is a dict with "goal" and "events" keys. Batch jobs get
+    Google's flat 50% token discount and amortize per-call overhead, at the
+    cost of a polling wait — so this path only engages for offline backlogs:
+    FOCUSFORGE_BATCH_ENABLED must be set, the google-genai client installed,
+    and at least _BATCH_THRESHOLD sessions queued. Otherwise each session
+    goes through the normal interactive path.
+
+    Returns one result dict per session, in input order.
+    """
+    if not (_batch_enabled() and BATCH_API_AVAILABLE and len(sessions) >= _BATCH_THRESHOLD):
+        return [
+            analyzeSessionWithGeminiAndTools(
+                session.get("goal", ""), session, api_key=api_key, use_tools=False
+            )
+            for session in sessions
+        ]
+
+    if not api_key:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("Gemini API key not provided.")
+
+    from gemini_analyzer import normalize_ai_fields, validate_output
+
+    # Precompute grouping once per session: used for the prompt and reused
+    # by the basic-analysis fallback
+    precomputed = []
+    lines = []
+    for i, session in enumerate(sessions):
+        events = session.get("events", [])
+        domain_data, workspaces, last_stop, events_summary = build_session_context(events)
+        precomputed.append((domain_data, workspaces, last_stop))
+
+        gemini_input = create_gemini_input(session.get("goal", ""), events, workspaces, last_stop, events_summary)
+        lines.append(json.dumps({
+            "key": f"session-{i}",
+            "request": {
+                "contents": [{"role": "user", "parts": [{"text": _PROMPT_PREFIX + gemini_input}]}],
+                "generation_config": {"temperature": 0.3, "top_p": 0.95, "top_k": 40},
+            },
+        }))
+
+    client = genai_client.Client(api_key=api_key)
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        f.write("\n".join(lines))
+        jsonl_path = f.name
+
+    try:
+        uploaded = client.files.upload(
+            file=jsonl_path,
+            config={"mime_type": "application/jsonl", "display_name": "focusforge-sessions"},
+        )
+        batch = client.batches.create(model="gemini-2.0-flash-exp", src=uploaded.name)
+
+        while batch.state.name not in _BATCH_TERMINAL_STATES:
+            time.sleep(_BATCH_POLL_INTERVAL_SEC)
+            batch = client.batches.get(name=batch.name)
+
+        if batch.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Batch job ended in state {batch.state.name}")
+
+        raw_results = client.files.download(file=batch.dest.file_name).decode("utf-8")
+        by_key = {}
+        for line in raw_results.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            candidates = entry.get("response", {}).get("candidates", [])
+            if candidates:
+                by_key[entry["key"]] = candidates[0]["content"]["parts"][0]["text"]
+    finally:
+        os.unlink(jsonl_path)
+
+    results = []
+    for i, session in enumerate(sessions):
+        goal = session.get("goal", "")
+        events = session.get("events", [])
+        try:
+            result = json.loads(clean_json_response(by_key[f"session-{i}"]))
+            result = normalize_ai_fields(result)
+            validate_output(result, events)
+            results.append(result)
+        except Exception as e:
+            logger.warning("Batch result for session %d unusable (%s), falling back to basic analysis", i, e)
+            results.append(analyzeSession(goal, {"events": events}, _precomputed=precomputed[i]))
+    return results
 
 
 if __name__ == "__main__":
@@ -384,6 +915,6 @@ if __name__ == "__main__":
             use_gemini=True,
             use_tools=True
         )
-        print(json.dumps(result, indent=2))
+        logger.info("%s", json.dumps(result, indent=2))
     except Exception as e:
-        print(f"Analysis not available: {e}")
+        logger.warning("Analysis not available: %s", e)
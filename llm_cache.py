@@ -0,0 +1,139 @@
+"""
+Exact-match response cache for Gemini calls.
+
+Keyed on a SHA-256 of the canonical request payload (model, prompt, input,
+sampling parameters, tool fingerprint), so repeated identical sessions — test
+loops, page reloads, retries — skip the network round-trip entirely.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import fastjson
+
+
+class MemoryBackend:
+    """In-process dict backend. Entries are (expires_at, value) pairs."""
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() > expires_at:
+            del self._entries[key]
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+
+
+class SQLiteBackend:
+    """File-backed backend so the cache survives process restarts
+    (useful for the subprocess-per-request analyzer path)."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._init_lock = threading.Lock()
+        self._ensure_table()
+
+    def _connect(self):
+        return sqlite3.connect(self._path)
+
+    def _ensure_table(self):
+        with self._init_lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL, value TEXT)"
+            )
+
+    def get(self, key: str):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT expires_at, value FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, value = row
+            if time.time() > expires_at:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            return fastjson.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, fastjson.dumps(value)),
+            )
+
+
+class LLMCache:
+    """Exact-match cache with hit/miss accounting.
+
+    Any object with get(key)/set(key, value, ttl) works as a backend;
+    MemoryBackend is the default, SQLiteBackend persists across processes.
+    """
+
+    DEFAULT_TTL_SEC = 3600  # 1 hour
+
+    def __init__(self, backend=None):
+        self._backend = backend if backend is not None else MemoryBackend()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def cache_key(
+        self,
+        model: str,
+        prompt: str,
+        input_json: str,
+        temperature: float,
+        tools_fingerprint: Optional[List[str]] = None,
+    ) -> str:
+        """Stable key over everything that determines the response.
+
+        Temperature is part of the key rather than a reason to skip caching:
+        the app pins its sampling parameters, so identical payloads map to
+        the same (cached) answer.
+        """
+        payload = fastjson.dumps(
+            {
+                "model": model,
+                "prompt": prompt,
+                "input": input_json,
+                "temperature": temperature,
+                "tools": tools_fingerprint or [],
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response, or None on miss/expiry."""
+        with self._lock:
+            value = self._backend.get(key)
+            if value is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL_SEC):
+        """Store a response under key for ttl seconds."""
+        with self._lock:
+            self._backend.set(key, value, ttl)
+
+
+# Shared default instance used by the Gemini callers
+default_cache = LLMCache()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Snapshot of the default cache's hit/miss counters (for tests)."""
+    return dict(default_cache.stats)
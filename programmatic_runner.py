@@ -0,0 +1,122 @@
+"""
+Restricted executor for model-emitted tool plans.
+
+Instead of round-tripping through Gemini once per tool call, the model may
+reply with a small fenced python block that calls the registered tools,
+filters their output, and binds a final `result`. The host executes that plan
+locally — raw tool output never enters the LLM context — and sends only
+`result` back for a single synthesis turn.
+
+The plan runs under an AST whitelist: only plain statements, comprehensions,
+lambdas, and calls to registered tool handlers or a short list of safe
+builtins are allowed. Imports, attribute access, and dunder names are
+rejected before anything executes.
+"""
+import ast
+import re
+from typing import Any, Dict, Optional
+
+
+class PlanExecutionError(Exception):
+    """Raised when a plan fails validation or execution."""
+
+
+_PLAN_FENCE_RE = re.compile(r"```python\s*(.*?)```", re.DOTALL)
+
+_ALLOWED_BUILTINS = {
+    "len": len,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "sorted": sorted,
+    "filter": filter,
+    "map": map,
+    "list": list,
+    "dict": dict,
+    "set": set,
+    "tuple": tuple,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "enumerate": enumerate,
+    "range": range,
+    "zip": zip,
+    "any": any,
+    "all": all,
+}
+
+# Statement/expression shapes a plan may use. Notably absent: imports,
+# attribute access, while loops, try, function/class definitions
+_ALLOWED_NODES = (
+    ast.Module, ast.Expr, ast.Assign, ast.AugAssign, ast.If, ast.For,
+    ast.Break, ast.Continue, ast.Pass,
+    ast.Name, ast.Load, ast.Store, ast.Constant,
+    ast.Call, ast.keyword, ast.Starred,
+    ast.List, ast.Tuple, ast.Dict, ast.Set,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.Subscript, ast.Slice,
+    ast.ListComp, ast.DictComp, ast.SetComp, ast.GeneratorExp, ast.comprehension,
+    ast.Lambda, ast.arguments, ast.arg,
+    ast.JoinedStr, ast.FormattedValue,
+)
+
+
+def extract_python_plan(response_text: str) -> Optional[str]:
+    """Return the fenced python block from a model response, if any."""
+    match = _PLAN_FENCE_RE.search(response_text)
+    return match.group(1).strip() if match else None
+
+
+def _validate(tree: ast.Module, allowed_names: set) -> None:
+    """Reject any construct outside the whitelist before execution."""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise PlanExecutionError(f"Disallowed construct: {type(node).__name__}")
+        if isinstance(node, ast.Name):
+            if node.id.startswith("_"):
+                raise PlanExecutionError(f"Disallowed name: {node.id}")
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                if func.id not in allowed_names:
+                    raise PlanExecutionError(f"Call to unknown function: {func.id}")
+            elif not isinstance(func, ast.Lambda):
+                raise PlanExecutionError("Only direct calls to named functions are allowed")
+
+
+def run_plan(code: str, tool_registry) -> Dict[str, Any]:
+    """Validate and execute a tool plan; return its final `result` binding.
+
+    The namespace contains the registered tool handlers (by tool name) plus
+    the safe builtins — nothing else. The plan must assign `result`.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        raise PlanExecutionError(f"Plan is not valid Python: {e}")
+
+    tool_handlers = {name: tool.handler for name, tool in tool_registry.tools.items()}
+    allowed_names = set(_ALLOWED_BUILTINS) | set(tool_handlers) | {"result"}
+    # Names bound inside the plan (loop vars, temporaries) are callable too
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            allowed_names.add(node.id)
+        elif isinstance(node, ast.arg):
+            allowed_names.add(node.arg)
+
+    _validate(tree, allowed_names)
+
+    namespace: Dict[str, Any] = dict(tool_handlers)
+    try:
+        exec(compile(tree, "<tool-plan>", "exec"), {"__builtins__": dict(_ALLOWED_BUILTINS)}, namespace)
+    except Exception as e:
+        raise PlanExecutionError(f"Plan execution failed: {e}")
+
+    if "result" not in namespace:
+        raise PlanExecutionError("Plan did not bind a `result` variable")
+    return namespace["result"]
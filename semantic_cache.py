@@ -0,0 +1,170 @@
+"""
+Semantic cache for near-duplicate Gemini calls.
+
+Exact-match caching (llm_cache) misses when a rerun differs trivially —
+"Prepare for interview" vs "Prepare for technical interview", or shifted
+timestamps. This layer embeds the canonicalized input and returns the cached
+response when the nearest stored vector clears a cosine-similarity threshold,
+skipping the full Gemini round-trip.
+
+Embeddings come from sentence-transformers (optional dependency; the cache
+disables itself gracefully when absent). Vectors live in a plain SQLite table
+and are compared brute-force — sessions per process number in the hundreds at
+most, so an indexed vector store would be overkill here.
+"""
+import math
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import fastjson
+
+# Try to import sentence-transformers (will fail gracefully if not installed)
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+_EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# Minimum Jaccard overlap between the current and cached session domain sets
+# for a semantic hit to be trusted
+_MIN_DOMAIN_OVERLAP = 0.6
+
+
+def _jaccard(a, b) -> float:
+    """Jaccard overlap of two iterables treated as sets."""
+    set_a, set_b = set(a), set(b)
+    union = set_a | set_b
+    if not union:
+        return 1.0
+    return len(set_a & set_b) / len(union)
+
+
+def verify_context_chain(current_ctx: Dict[str, Any], cached_ctx: Dict[str, Any]) -> bool:
+    """Check that a cached entry actually belongs to the current session.
+
+    Embedding similarity alone will return one session's plan for a
+    different session whose URL lists merely look alike. A hit must also
+    share most of its event domains (Jaccard >= 0.6), the same lastStop
+    host, and at least one goal token with the cached entry — otherwise the
+    response would reference activity the current session never had.
+    """
+    if _jaccard(current_ctx.get("domains") or (), cached_ctx.get("domains") or ()) < _MIN_DOMAIN_OVERLAP:
+        return False
+    if (current_ctx.get("last_stop_host") or "") != (cached_ctx.get("last_stop_host") or ""):
+        return False
+    current_tokens = set((current_ctx.get("goal") or "").lower().split())
+    cached_tokens = set((cached_ctx.get("goal") or "").lower().split())
+    if current_tokens and cached_tokens and not (current_tokens & cached_tokens):
+        return False
+    return True
+
+
+class SemanticCache:
+    """Nearest-neighbour response cache over embedded inputs."""
+
+    DEFAULT_TTL_SEC = 3600  # 1 hour
+    DEFAULT_THRESHOLD = 0.93
+
+    def __init__(self, db_path: str = ':memory:'):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._model = None
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS semantic_cache ("
+            "id INTEGER PRIMARY KEY, "
+            "namespace TEXT, "
+            "embedding TEXT, "
+            "response TEXT, "
+            "context TEXT, "
+            "expires_at REAL)"
+        )
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed text with the (lazily loaded) sentence-transformer model."""
+        if self._model is None:
+            self._model = SentenceTransformer(_EMBEDDING_MODEL_NAME)
+        return [float(x) for x in self._model.encode(text, normalize_embeddings=True)]
+
+    @staticmethod
+    def _cosine(a: List[float], b: List[float]) -> float:
+        """Cosine similarity; vectors from _embed are already normalized."""
+        dot = sum(x * y for x, y in zip(a, b))
+        norm_a = math.sqrt(sum(x * x for x in a))
+        norm_b = math.sqrt(sum(x * x for x in b))
+        if not norm_a or not norm_b:
+            return 0.0
+        return dot / (norm_a * norm_b)
+
+    def store(
+        self,
+        query_text: str,
+        response_json: Dict[str, Any],
+        context: Optional[Dict[str, Any]] = None,
+        namespace: str = '',
+        ttl: float = DEFAULT_TTL_SEC,
+    ) -> None:
+        """Store a response under the embedding of query_text."""
+        if not EMBEDDINGS_AVAILABLE:
+            return
+        embedding = self._embed(query_text)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache (namespace, embedding, response, context, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    fastjson.dumps(embedding),
+                    fastjson.dumps(response_json),
+                    fastjson.dumps(context or {}),
+                    time.time() + ttl,
+                ),
+            )
+            self._conn.commit()
+
+    def lookup(
+        self,
+        query_text: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        namespace: str = '',
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return the cached response nearest to query_text, or None if no
+        stored entry clears the similarity threshold.
+
+        When context is given, candidates must also pass
+        verify_context_chain against the context stored with them, so a
+        similar-looking but unrelated session never gets this one's plan.
+        """
+        if not EMBEDDINGS_AVAILABLE:
+            return None
+        embedding = self._embed(query_text)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM semantic_cache WHERE expires_at < ?", (now,))
+            rows = self._conn.execute(
+                "SELECT embedding, response, context FROM semantic_cache WHERE namespace = ?",
+                (namespace,),
+            ).fetchall()
+
+        candidates = []
+        for stored_embedding, response, stored_context in rows:
+            similarity = self._cosine(embedding, fastjson.loads(stored_embedding))
+            if similarity >= threshold:
+                candidates.append((similarity, response, stored_context))
+
+        # Best similarity first; return the nearest candidate whose context
+        # chain checks out
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for _similarity, response, stored_context in candidates:
+            if context is not None and not verify_context_chain(context, fastjson.loads(stored_context)):
+                continue
+            return fastjson.loads(response)
+        return None
+
+
+# Shared default instance (in-memory, per process)
+default_semantic_cache = SemanticCache()
@@ -2,7 +2,7 @@
 Test file with mocked events for testing the analyzer.
 """
 import json
-from analyzer import analyzeSession
+from analyzer import analyzeSession, group_events_by_domain, NUMPY_AVAILABLE
 from gemini_analyzer import analyzeSessionWithGemini
 
 
@@ -85,11 +85,36 @@ def test_with_goal():
     print()
 
 
+def test_vectorized_grouping_parity():
+    """Test that the array-backed grouping fast path matches the plain loop."""
+    print("=" * 60)
+    print("TEST 5: Vectorized Grouping Parity")
+    print("=" * 60)
+
+    if not NUMPY_AVAILABLE:
+        print("NumPy not installed, skipping vectorized path check.")
+        print()
+        return
+
+    from analyzer import _group_events_by_domain_vectorized
+
+    events = [
+        {"ts": 1730000000000 + i, "url": f"https://site{i % 7}.com/page{i % 13}", "durationSec": i % 50}
+        for i in range(1000)
+    ]
+    plain = group_events_by_domain(events)
+    vectorized = _group_events_by_domain_vectorized(events)
+    assert vectorized == plain, "vectorized grouping diverged from plain loop"
+    print("Vectorized grouping matches the plain loop.")
+    print()
+
+
 if __name__ == "__main__":
     test_basic_analysis()
     test_multiple_domains()
     test_empty_events()
     test_with_goal()
+    test_vectorized_grouping_parity()
     
     print("\n" + "=" * 60)
     print("All tests completed!")
@@ -101,10 +101,78 @@ def test_basic_fallback():
     return True
 
 
+def test_tool_call_cache():
+    """Test request-scoped memoization of identical tool calls."""
+    print("\n" + "=" * 60)
+    print("Testing Tool Call Cache")
+    print("=" * 60)
+
+    from agent_planner import execute_tool_call_cached
+    from tools.tool_registry import ToolRegistry, Tool
+
+    call_count = {"count": 0}
+
+    def counting_handler(message: str) -> dict:
+        call_count["count"] += 1
+        return {"echo": message}
+
+    registry = ToolRegistry()
+    registry.register(Tool(
+        name="counting_tool",
+        description="Counts invocations",
+        parameters={"properties": {"message": {"type": "string"}}, "required": ["message"]},
+        handler=counting_handler
+    ))
+
+    tool_cache = {}
+    first = execute_tool_call_cached("counting_tool", {"message": "hi"}, registry, tool_cache)
+    second = execute_tool_call_cached("counting_tool", {"message": "hi"}, registry, tool_cache)
+
+    assert call_count["count"] == 1, "Identical call should be served from cache"
+    assert first == second, "Cached result should match original"
+    print("✓ Identical tool calls served from cache")
+
+    execute_tool_call_cached("counting_tool", {"message": "bye"}, registry, tool_cache)
+    assert call_count["count"] == 2, "Different arguments should invoke the handler"
+    print("✓ Different arguments bypass the cache")
+
+    return True
+
+
+def test_llm_cache():
+    """Test the exact-match LLM response cache."""
+    print("=" * 60)
+    print("TEST: Exact-Match LLM Cache")
+    print("=" * 60)
+
+    from llm_cache import LLMCache
+
+    cache = LLMCache()
+    key = cache.cache_key("model-x", "prompt", '{"goal":"g"}', 0.3, ["tool_a"])
+    assert key == cache.cache_key("model-x", "prompt", '{"goal":"g"}', 0.3, ["tool_a"]), \
+        "Identical payloads should produce identical keys"
+    assert key != cache.cache_key("model-y", "prompt", '{"goal":"g"}', 0.3, ["tool_a"]), \
+        "Different model should produce a different key"
+
+    assert cache.get(key) is None, "Fresh cache should miss"
+    cache.set(key, {"answer": 1})
+    assert cache.get(key) == {"answer": 1}, "Stored value should be returned"
+    assert cache.stats == {"hits": 1, "misses": 1}, f"Unexpected stats: {cache.stats}"
+    print("✓ Keys are stable and responses round-trip")
+
+    cache.set(key, {"answer": 2}, ttl=-1)
+    assert cache.get(key) is None, "Expired entries should miss"
+    print("✓ Expired entries are evicted")
+
+    return True
+
+
 if __name__ == "__main__":
     results = []
     results.append(test_planner())
     results.append(test_basic_fallback())
+    results.append(test_tool_call_cache())
+    results.append(test_llm_cache())
     
     print("\n" + "=" * 60)
     if all(results):
@@ -0,0 +1,113 @@
+"""
+Test file for the semantic cache and its context-chain verification.
+
+Uses a fake embedding model so the tests run without sentence-transformers
+or the network.
+"""
+import semantic_cache
+from semantic_cache import SemanticCache, verify_context_chain
+
+
+class FakeModel:
+    """Maps texts to fixed unit vectors so similarity is controllable."""
+
+    VECTORS = {
+        "interview": [1.0, 0.0, 0.0],
+        "interview-reworded": [0.99, 0.14, 0.0],  # near-duplicate of interview
+        "applications": [0.0, 1.0, 0.0],
+    }
+
+    def encode(self, text, normalize_embeddings=True):
+        for key, vector in self.VECTORS.items():
+            if key in text:
+                return vector
+        return [0.0, 0.0, 1.0]
+
+
+def _make_cache():
+    cache = SemanticCache()
+    cache._model = FakeModel()
+    return cache
+
+
+def test_context_chain_verification():
+    """Test verify_context_chain accept/reject cases."""
+    print("=" * 60)
+    print("TEST 1: Context-Chain Verification")
+    print("=" * 60)
+
+    current = {
+        "goal": "Prepare for technical interview",
+        "domains": ["leetcode.com", "docs.google.com"],
+        "last_stop_host": "leetcode.com",
+    }
+
+    same_session = dict(current, goal="Prepare for interview")
+    assert verify_context_chain(current, same_session), "Reworded goal should verify"
+    print("✓ Same session with reworded goal verifies")
+
+    other_domains = dict(current, domains=["linkedin.com", "indeed.com"])
+    assert not verify_context_chain(current, other_domains), "Disjoint domains must fail"
+    print("✓ Disjoint domain sets rejected")
+
+    other_stop = dict(current, last_stop_host="docs.google.com")
+    assert not verify_context_chain(current, other_stop), "Different lastStop host must fail"
+    print("✓ Different lastStop host rejected")
+
+    other_goal = dict(current, goal="Plan summer vacation")
+    assert not verify_context_chain(current, other_goal), "Disjoint goal tokens must fail"
+    print("✓ Disjoint goal tokens rejected")
+
+    return True
+
+
+def test_semantic_lookup():
+    """Test similarity lookup with and without context verification."""
+    print("=" * 60)
+    print("TEST 2: Semantic Lookup")
+    print("=" * 60)
+
+    original_available = semantic_cache.EMBEDDINGS_AVAILABLE
+    semantic_cache.EMBEDDINGS_AVAILABLE = True
+    try:
+        cache = _make_cache()
+        context = {
+            "goal": "Prepare for interview",
+            "domains": ["leetcode.com"],
+            "last_stop_host": "leetcode.com",
+        }
+        cache.store("interview session", {"plan": "practice"}, context=context)
+
+        hit = cache.lookup("interview-reworded session", context=context)
+        assert hit == {"plan": "practice"}, "Near-duplicate with matching context should hit"
+        print("✓ Near-duplicate session with matching context hits")
+
+        miss = cache.lookup("applications session", context=context)
+        assert miss is None, "Dissimilar input should miss"
+        print("✓ Dissimilar session misses")
+
+        other_context = {
+            "goal": "Prepare for interview",
+            "domains": ["linkedin.com"],
+            "last_stop_host": "linkedin.com",
+        }
+        false_hit = cache.lookup("interview-reworded session", context=other_context)
+        assert false_hit is None, "Similar text with wrong context must not hit"
+        print("✓ Similar text with mismatched context rejected")
+    finally:
+        semantic_cache.EMBEDDINGS_AVAILABLE = original_available
+
+    return True
+
+
+if __name__ == "__main__":
+    results = []
+    results.append(test_context_chain_verification())
+    results.append(test_semantic_lookup())
+
+    print("\n" + "=" * 60)
+    if all(results):
+        print("✅ ALL TESTS PASSED!")
+    else:
+        print("❌ SOME TESTS FAILED")
+    print("=" * 60)
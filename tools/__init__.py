@@ -1,10 +1,29 @@
-"""
-Tool system for FocusForge AI agent.
-Provides calendar and email access capabilities.
-"""
-
-from .calendar_tool import CalendarTool, create_calendar_tools
-from .email_tool import EmailTool, create_email_tool
-from .tool_registry import ToolRegistry, Tool
-
-__all__ = ['CalendarTool', 'EmailTool', 'ToolRegistry', 'Tool', 'create_calendar_tools', 'create_email_tool']
+"""
+Tool system for FocusForge AI agent.
+Provides calendar and email access capabilities.
+"""
+import importlib
+
+# tool_registry is a tiny dataclass module, so it stays eager; the calendar
+# and email modules are loaded on first attribute access (PEP 562) so that
+# 'from tools import Tool' doesn't drag them in
+from .tool_registry import ToolRegistry, Tool
+
+__all__ = ['CalendarTool', 'EmailTool', 'ToolRegistry', 'Tool', 'create_calendar_tools', 'create_email_tool']
+
+_LAZY_EXPORTS = {
+    'CalendarTool': '.calendar_tool',
+    'create_calendar_tools': '.calendar_tool',
+    'EmailTool': '.email_tool',
+    'create_email_tool': '.email_tool',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    attr = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so subsequent lookups skip __getattr__
+    globals()[name] = attr
+    return attr
@@ -1,21 +1,88 @@
 """
 Calendar tool for accessing and managing calendar events.
 """
+import bisect
 import os
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import json
 
-# Try to import Google Calendar API
-try:
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import Flow
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    CALENDAR_AVAILABLE = True
-except ImportError:
-    CALENDAR_AVAILABLE = False
-    print("Warning: Google Calendar API not installed. Calendar features will be disabled.")
+# The Google API clients are heavyweight (googleapiclient pulls in httplib2
+# and walks its discovery cache at import), so they are loaded on first
+# authentication instead of at module import. Token-less users — including
+# every test run — never pay the cost
+_google = None
+_google_import_failed = False
+
+
+def _load_google():
+    """Import and cache the Google Calendar client on first use.
+
+    Returns a (Credentials, build, HttpError) tuple, or None when the
+    packages are not installed.
+    """
+    global _google, _google_import_failed
+    if _google is None and not _google_import_failed:
+        try:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+            from googleapiclient.errors import HttpError
+            _google = (Credentials, build, HttpError)
+        except ImportError:
+            _google_import_failed = True
+            print("Warning: Google Calendar API not installed. Calendar features will be disabled.")
+    return _google
+
+
+def _iso_to_ts(value: str) -> float:
+    """POSIX timestamp for an ISO 8601 string. A trailing 'Z' is rewritten
+    by slicing rather than .replace(), which would scan the whole string."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _slot_is_free(busy_starts: List[float], busy_ends: List[float],
+                  start_ts: float, end_ts: float) -> bool:
+    """Overlap test against sorted, disjoint busy intervals in O(log N).
+
+    bisect locates the first busy interval starting after the slot start;
+    only that interval and its predecessor can possibly overlap the slot.
+    """
+    i = bisect.bisect_right(busy_starts, start_ts)
+    if i < len(busy_starts) and busy_starts[i] < end_ts:
+        return False
+    if i > 0 and busy_ends[i - 1] > start_ts:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def _get_calendar_service():
+    """Build (once) the Calendar service for the env-configured token.
+
+    The token JSON parse and — far costlier — the discovery-document parse
+    inside build() are paid by the first instance only; every later
+    CalendarTool gets the cached client. cache_discovery=False skips
+    googleapiclient's slow filesystem discovery cache.
+    """
+    # For now, use service account or OAuth token from env
+    # In production, implement full OAuth flow
+    token = os.getenv('GOOGLE_CALENDAR_TOKEN')
+    if not token:
+        return None
+
+    google = _load_google()
+    if google is None:
+        return None
+    Credentials, build, _ = google
+    try:
+        creds = Credentials.from_authorized_user_info(json.loads(token))
+        return build('calendar', 'v3', credentials=creds, cache_discovery=False)
+    except Exception as e:
+        print(f"Warning: Calendar authentication failed: {e}")
+        return None
 
 
 class CalendarTool:
@@ -34,18 +101,7 @@ class CalendarTool:
     
     def _authenticate(self):
         """Authenticate with Google Calendar API."""
-        if not CALENDAR_AVAILABLE:
-            return
-        
-        # For now, use service account or OAuth token from env
-        # In production, implement full OAuth flow
-        token = os.getenv('GOOGLE_CALENDAR_TOKEN')
-        if token:
-            try:
-                creds = Credentials.from_authorized_user_info(json.loads(token))
-                self.service = build('calendar', 'v3', credentials=creds)
-            except Exception as e:
-                print(f"Warning: Calendar authentication failed: {e}")
+        self.service = _get_calendar_service()
     
     def get_upcoming_events(self, max_results: int = 10, time_min: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
@@ -90,11 +146,12 @@ class CalendarTool:
                 })
             
             return result
-        except HttpError as e:
-            print(f"Error fetching calendar events: {e}")
-            return []
         except Exception as e:
-            print(f"Unexpected error in get_upcoming_events: {e}")
+            # _google is always loaded when self.service exists
+            if _google is not None and isinstance(e, _google[2]):
+                print(f"Error fetching calendar events: {e}")
+            else:
+                print(f"Unexpected error in get_upcoming_events: {e}")
             return []
     
     def check_availability(self, start_time: datetime, end_time: datetime) -> bool:
@@ -112,26 +169,49 @@ class CalendarTool:
             return True  # Assume available if calendar not connected
         
         try:
+            # Compare POSIX timestamps: the window is parsed once, and
+            # mixing naive and timezone-aware datetimes (the API returns
+            # aware times) can no longer blow up the comparison
+            start_ts = start_time.timestamp()
+            end_ts = end_time.timestamp()
+
             # Get events in the time range
             events = self.get_upcoming_events(
                 time_min=start_time,
                 max_results=50
             )
-            
-            # Check for conflicts
+
+            # Events arrive sorted by start (orderBy='startTime'), so the
+            # scan stops at the first event starting at or after the window
+            # end — nothing later can overlap — and an event's end is only
+            # parsed when its start falls inside the window
             for event in events:
-                event_start = datetime.fromisoformat(event['start'].replace('Z', '+00:00'))
-                event_end = datetime.fromisoformat(event['end'].replace('Z', '+00:00'))
-                
-                # Check for overlap
-                if (event_start < end_time and event_end > start_time):
+                if _iso_to_ts(event['start']) >= end_ts:
+                    break
+                if _iso_to_ts(event['end']) > start_ts:
                     return False
-            
+
             return True
         except Exception as e:
             print(f"Error checking availability: {e}")
             return True  # Assume available on error
     
+    def _get_busy_intervals(self, time_min: datetime, time_max: datetime) -> tuple:
+        """Fetch the busy intervals for a window in one freebusy.query call.
+
+        Returns parallel (starts, ends) lists of POSIX timestamps, sorted by
+        start — the API returns the intervals merged and ordered.
+        """
+        response = self.service.freebusy().query(body={
+            "timeMin": time_min.isoformat() + 'Z',
+            "timeMax": time_max.isoformat() + 'Z',
+            "items": [{"id": "primary"}],
+        }).execute()
+        busy = response.get('calendars', {}).get('primary', {}).get('busy', [])
+        starts = [_iso_to_ts(interval['start']) for interval in busy]
+        ends = [_iso_to_ts(interval['end']) for interval in busy]
+        return starts, ends
+
     def suggest_meeting_times(self, duration_minutes: int = 30, days_ahead: int = 7) -> List[Dict[str, Any]]:
         """
         Suggest available meeting times.
@@ -144,33 +224,47 @@ class CalendarTool:
             List of suggested time slots
         """
         if not self.service:
-            # Return default suggestions if calendar not available
+            # Return default suggestions if calendar not available. Stop at
+            # 10 instead of building days_ahead * 3 dicts and slicing, and
+            # build each slot's datetime once
+            duration = timedelta(minutes=duration_minutes)
             suggestions = []
             now = datetime.now()
             for day in range(days_ahead):
                 date = now + timedelta(days=day)
                 # Suggest 9am, 2pm, 4pm
                 for hour in [9, 14, 16]:
+                    start_dt = date.replace(hour=hour, minute=0, second=0, microsecond=0)
                     suggestions.append({
-                        'start': date.replace(hour=hour, minute=0, second=0, microsecond=0).isoformat(),
-                        'end': (date.replace(hour=hour, minute=0, second=0, microsecond=0) + 
-                               timedelta(minutes=duration_minutes)).isoformat(),
+                        'start': start_dt.isoformat(),
+                        'end': (start_dt + duration).isoformat(),
                         'available': True
                     })
-            return suggestions[:10]  # Return top 10
+                    if len(suggestions) >= 10:
+                        return suggestions
+            return suggestions
         
         try:
             suggestions = []
             now = datetime.now()
-            
+
+            # One freebusy.query covers the whole search window; previously
+            # every candidate slot (up to days_ahead * 6) cost its own
+            # events.list round-trip via check_availability
+            utc_now = datetime.utcnow()
+            busy_starts, busy_ends = self._get_busy_intervals(
+                utc_now, utc_now + timedelta(days=days_ahead)
+            )
+
             for day in range(days_ahead):
                 date = now + timedelta(days=day)
                 # Check common meeting times
                 for hour in [9, 10, 11, 14, 15, 16]:
                     start_time = date.replace(hour=hour, minute=0, second=0, microsecond=0)
                     end_time = start_time + timedelta(minutes=duration_minutes)
-                    
-                    if self.check_availability(start_time, end_time):
+
+                    if _slot_is_free(busy_starts, busy_ends,
+                                     start_time.timestamp(), end_time.timestamp()):
                         suggestions.append({
                             'start': start_time.isoformat(),
                             'end': end_time.isoformat(),
@@ -189,10 +283,17 @@ class CalendarTool:
             return []
 
 
+@lru_cache(maxsize=1)
 def create_calendar_tools() -> List['Tool']:
-    """Create Tool instances for calendar access."""
+    """Create Tool instances for calendar access.
+
+    Memoized: the tools close over one CalendarTool, so repeated calls
+    (e.g. an agent loop rebuilding its registry per turn) reuse the
+    authenticated client instead of re-running auth and reallocating the
+    dataclasses.
+    """
     from .tool_registry import Tool
-    
+
     calendar = CalendarTool()
     
     def get_upcoming_events_handler(max_results: int = 10) -> Dict[str, Any]:
@@ -1,7 +1,9 @@
 """
 Email tool for accessing and sending emails.
 """
+import base64
 import os
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 import json
 
@@ -14,15 +16,54 @@ try:
 except ImportError:
     EMAIL_AVAILABLE = False
 
-# Try to import Gmail API
-try:
-    from google.oauth2.credentials import Credentials
-    from google_auth_oauthlib.flow import Flow
-    from googleapiclient.discovery import build
-    from googleapiclient.errors import HttpError
-    GMAIL_AVAILABLE = True
-except ImportError:
-    GMAIL_AVAILABLE = False
+# The Gmail client shares the heavyweight googleapiclient stack with the
+# calendar tool; load it on first authentication instead of at module
+# import, so token-less users never pay the cost
+_google = None
+_google_import_failed = False
+
+
+def _load_google():
+    """Import and cache the Gmail client on first use.
+
+    Returns a (Credentials, build, HttpError) tuple, or None when the
+    packages are not installed.
+    """
+    global _google, _google_import_failed
+    if _google is None and not _google_import_failed:
+        try:
+            from google.oauth2.credentials import Credentials
+            from googleapiclient.discovery import build
+            from googleapiclient.errors import HttpError
+            _google = (Credentials, build, HttpError)
+        except ImportError:
+            _google_import_failed = True
+    return _google
+
+
+@lru_cache(maxsize=1)
+def _get_gmail_service():
+    """Build (once) the Gmail service for the env-configured token.
+
+    The token JSON parse and the discovery-document parse inside build()
+    are paid by the first instance only; every later EmailTool gets the
+    cached client. cache_discovery=False skips googleapiclient's slow
+    filesystem discovery cache.
+    """
+    token = os.getenv('GMAIL_API_TOKEN')
+    if not token:
+        return None
+
+    google = _load_google()
+    if google is None:
+        return None
+    Credentials, build, _ = google
+    try:
+        creds = Credentials.from_authorized_user_info(json.loads(token))
+        return build('gmail', 'v1', credentials=creds, cache_discovery=False)
+    except Exception as e:
+        print(f"Warning: Gmail authentication failed: {e}")
+        return None
 
 
 class EmailTool:
@@ -35,16 +76,7 @@ class EmailTool:
     
     def _authenticate(self):
         """Authenticate with Gmail API if available."""
-        if not GMAIL_AVAILABLE:
-            return
-        
-        token = os.getenv('GMAIL_API_TOKEN')
-        if token:
-            try:
-                creds = Credentials.from_authorized_user_info(json.loads(token))
-                self.gmail_service = build('gmail', 'v1', credentials=creds)
-            except Exception as e:
-                print(f"Warning: Gmail authentication failed: {e}")
+        self.gmail_service = _get_gmail_service()
     
     def get_recent_emails(self, max_results: int = 10, query: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -66,34 +98,65 @@ class EmailTool:
                 maxResults=max_results,
                 q=query or ''
             ).execute()
-            
+
             messages = results.get('messages', [])
+            if not messages:
+                return []
+
+            # One batched HTTP request fetches every message's metadata;
+            # previously each message cost its own round-trip
+            by_id: Dict[str, Dict[str, Any]] = {}
+
+            def _collect(request_id, response, exception):
+                if exception is None and response is not None:
+                    by_id[request_id] = response
+
+            batch = self.gmail_service.new_batch_http_request()
+            for msg in messages:
+                batch.add(
+                    self.gmail_service.users().messages().get(
+                        userId='me',
+                        id=msg['id'],
+                        format='metadata',
+                        metadataHeaders=['From', 'Subject', 'Date']
+                    ),
+                    request_id=msg['id'],
+                    callback=_collect
+                )
+            batch.execute()
+
             emails = []
-            
             for msg in messages:
-                message = self.gmail_service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='metadata',
-                    metadataHeaders=['From', 'Subject', 'Date']
-                ).execute()
-                
-                headers = {h['name']: h['value'] for h in message.get('payload', {}).get('headers', [])}
-                
+                message = by_id.get(msg['id'])
+                if message is None:
+                    continue
+                # Pull just the three headers we ship instead of building a
+                # full name->value dict
+                sender = subject = date = ''
+                for header in message.get('payload', {}).get('headers', []):
+                    name = header['name']
+                    if name == 'From':
+                        sender = header['value']
+                    elif name == 'Subject':
+                        subject = header['value']
+                    elif name == 'Date':
+                        date = header['value']
+
                 emails.append({
                     'id': msg['id'],
-                    'from': headers.get('From', ''),
-                    'subject': headers.get('Subject', ''),
-                    'date': headers.get('Date', ''),
+                    'from': sender,
+                    'subject': subject,
+                    'date': date,
                     'snippet': message.get('snippet', '')
                 })
-            
+
             return emails
-        except HttpError as e:
-            print(f"Error fetching emails: {e}")
-            return []
         except Exception as e:
-            print(f"Unexpected error in get_recent_emails: {e}")
+            # _google is always loaded when self.gmail_service exists
+            if _google is not None and isinstance(e, _google[2]):
+                print(f"Error fetching emails: {e}")
+            else:
+                print(f"Unexpected error in get_recent_emails: {e}")
             return []
     
     def send_email(self, to: str, subject: str, body: str, is_html: bool = False) -> Dict[str, Any]:
@@ -121,9 +184,9 @@ class EmailTool:
                 else:
                     message.attach(MIMEText(body, 'plain'))
                 
-                raw_message = message.as_string().encode('utf-8')
-                import base64
-                encoded_message = base64.urlsafe_b64encode(raw_message).decode('utf-8')
+                # as_bytes() emits the wire form directly; as_string() would
+                # materialize a str only to re-encode it
+                encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
                 
                 send_message = self.gmail_service.users().messages().send(
                     userId='me',
@@ -204,10 +267,16 @@ class EmailTool:
         }
 
 
+@lru_cache(maxsize=1)
 def create_email_tool() -> List['Tool']:
-    """Create Tool instances for email access."""
+    """Create Tool instances for email access.
+
+    Memoized: the tools close over one EmailTool, so repeated calls reuse
+    the authenticated client instead of re-running auth and reallocating
+    the dataclasses.
+    """
     from .tool_registry import Tool
-    
+
     email = EmailTool()
     
     def get_recent_emails_handler(max_results: int = 10, query: Optional[str] = None) -> Dict[str, Any]:
@@ -1,49 +1,78 @@
 """
 Tool registry for managing available tools for the AI agent.
 """
-from typing import Dict, List, Callable, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Callable, Any, Iterator, Optional, ValuesView
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class Tool:
     """Represents a tool that can be called by the AI agent."""
     name: str
     description: str
     parameters: Dict[str, Any]  # JSON schema for parameters
     handler: Callable  # Function to execute the tool
-    
+    # Memoized Gemini declaration: a tool's schema never changes after
+    # construction, and the agent loop asks for it on every LLM turn
+    _gemini_function: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False)
+
     def to_gemini_function(self) -> Dict[str, Any]:
-        """Convert tool to Gemini function calling format."""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": {
-                "type": "object",
-                "properties": self.parameters.get("properties", {}),
-                "required": self.parameters.get("required", [])
+        """Convert tool to Gemini function calling format (cached)."""
+        if self._gemini_function is None:
+            self._gemini_function = {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": self.parameters.get("properties", {}),
+                    "required": self.parameters.get("required", [])
+                }
             }
-        }
+        return self._gemini_function
 
 
 class ToolRegistry:
     """Registry for managing available tools."""
-    
+
+    __slots__ = ('tools', '_gemini_functions')
+
     def __init__(self):
         self.tools: Dict[str, Tool] = {}
-    
+        # Gemini declaration list maintained incrementally alongside
+        # self.tools, in registration order
+        self._gemini_functions: List[Dict[str, Any]] = []
+
     def register(self, tool: Tool):
         """Register a tool."""
-        self.tools[tool.name] = tool
+        if tool.name in self.tools:
+            # Re-registration replaces the old declaration, so rebuild to
+            # keep the list aligned with self.tools
+            self.tools[tool.name] = tool
+            self._gemini_functions = [t.to_gemini_function() for t in self.tools.values()]
+        else:
+            self.tools[tool.name] = tool
+            self._gemini_functions.append(tool.to_gemini_function())
     
     def get_tool(self, name: str) -> Optional[Tool]:
         """Get a tool by name."""
         return self.tools.get(name)
     
-    def list_tools(self) -> List[Tool]:
-        """List all registered tools."""
-        return list(self.tools.values())
+    def list_tools(self) -> ValuesView[Tool]:
+        """List all registered tools (a live view; no list is allocated)."""
+        return self.tools.values()
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self.tools.values())
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tools
     
     def get_gemini_functions(self) -> List[Dict[str, Any]]:
-        """Get all tools in Gemini function calling format."""
-        return [tool.to_gemini_function() for tool in self.tools.values()]
+        """Get all tools in Gemini function calling format.
+
+        O(1): the list is built at registration time, not per request.
+        """
+        return self._gemini_functions